@@ -0,0 +1,350 @@
+import argparse
+import atexit
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+try:
+	import resource
+except ImportError:
+	# not on Windows, where memory is left unmeasured
+	resource = None
+
+# Benchmarks for the barn door build.
+#
+#	python benchmarks/bench.py run               time everything and print a table
+#	python benchmarks/bench.py record            ... and save it as the baseline
+#	python benchmarks/bench.py compare           ... and fail on regressions against the baseline
+#
+# With --backend freecad (or auto, when FreeCAD can be imported) the real
+# FreeCAD is used, headless. Put FreeCAD's lib directory on PYTHONPATH for that.
+# With --backend stub the FreeCAD API is replaced by stubcad.py, which measures
+# the cost of our own python rather than of the CAD kernel.
+#
+# Baselines are kept per backend in benchmarks/baselines/<backend>.json.
+#
+# Memory is measured as the growth in the peak resident set size (RSS) of a
+# fresh process over one run of each benchmark, which counts what OCC and
+# Coin allocate as well as python. tracemalloc's python-only peak is kept
+# alongside it.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+BASELINE_DIR = os.path.join(HERE, "baselines")
+# bump this when the set or meaning of the benchmarks changes
+BASELINE_SCHEMA = 2
+# time changes smaller than this (ms) are noise. The stub runs each part in
+# well under a millisecond, where a busy machine alone can double the time,
+# so only the full build is big enough to gate on; its object counts and
+# python memory are deterministic and gated on whatever the backend.
+MIN_DELTA_MS = {"stub": 5, "freecad": 1}
+
+def loadMacro(backend):
+	"""
+	Imports macro.py against the requested backend
+
+	Returns:
+		(macro module, profiles module, name of the backend actually used)
+	"""
+	if backend == "auto":
+		try:
+			import FreeCAD  # noqa: F401
+			backend = "freecad"
+		except ImportError:
+			backend = "stub"
+	if backend == "stub":
+		import stubcad
+		stubcad.install()
+	# just the functions, not a build of the assembly
+	os.environ["BARNDOOR_IMPORT_ONLY"] = "1"
+	import macro
+	import profiles
+	# keep the SVGs out of the user's export directory, and remove them after
+	export_dir = tempfile.TemporaryDirectory(prefix="barndoor-bench-")
+	atexit.register(export_dir.cleanup)
+	macro.EXPORT_DIR = export_dir.name
+	return macro, profiles, backend
+
+def newDocument(macro, name):
+	macro.deleteExistingDocument(name)
+	macro.doc = macro.App.newDocument(name)
+	return macro.doc
+
+def closeDocument(macro, doc):
+	macro.App.closeDocument(doc.Name)
+	macro.doc = None
+
+def benchmarks(macro, profiles, backend):
+	"""
+	Returns the benchmarks for a backend as a list of (name, setup, body)
+
+	setup() is untimed and returns the argument given to body(). body()
+	returns the FreeCAD document it built into (or None) and a count of the
+	objects it produced.
+	"""
+	cases = []
+
+	def build(_):
+		doc = macro.build("BenchBuild")
+		return doc, len(doc.Objects)
+	cases.append(("build", lambda: None, build))
+
+	if backend == "freecad":
+		# the same assembly from FreeCADCmd workers, to set against build
+		def build_parallel(_):
+			doc = macro.buildParallel("BenchBuildParallel")
+			return doc, len(doc.Objects)
+		cases.append(("build_parallel", lambda: None, build_parallel))
+
+	for part_name, builder in macro.PARTS:
+		def part(doc, builder=builder):
+			builder()
+			return doc, len(doc.Objects)
+		cases.append((f"part:{part_name}", lambda: newDocument(macro, "BenchPart"), part))
+
+	def export_setup():
+		doc = newDocument(macro, "BenchExport")
+		sketches = [macro.drawProfile(fn(), name=name) for name, fn in profiles.FLAT_PARTS.items()]
+		return doc, sketches
+	def export(arg):
+		doc, sketches = arg
+		for sketch in sketches:
+			macro.exportSketch(sketch)
+		return doc, len(sketches)
+	cases.append(("export_svg", export_setup, export))
+
+	def profile_math(_):
+		segments = 0
+		for fn in profiles.FLAT_PARTS.values():
+			p = fn()
+			segments += len(p["holes"]) + sum(len(s) for s in p["slots"])
+			segments += 1 if isinstance(p["outline"], dict) else len(p["outline"])
+		for sections in (profiles.ALT_AXIS_SECTIONS, profiles.AZ_AXLE_SECTIONS, profiles.AZ_CLAMP_BOLT_SECTIONS):
+			segments += len(profiles.bolt_profile(sections))
+		return None, segments
+	cases.append(("profile_math", lambda: None, profile_math))
+
+	def validate(_):
+		checked = 0
+		for fn in profiles.FLAT_PARTS.values():
+			profiles.validate_profile(fn())
+			checked += 1
+		for sections in (profiles.ALT_AXIS_SECTIONS, profiles.AZ_AXLE_SECTIONS, profiles.AZ_CLAMP_BOLT_SECTIONS):
+			profiles.validate_loop(profiles.bolt_profile(sections))
+			checked += 1
+		return None, checked
+	cases.append(("validate", lambda: None, validate))
+	return cases
+
+def peakRss():
+	# the high water mark of this process's resident memory in KiB, None
+	# where it can't be had
+	if resource is None:
+		return None
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# bytes on macOS, KiB elsewhere
+	return rss / 1024 if sys.platform == "darwin" else rss
+
+def measure(macro, setup, body, repeat):
+	"""
+	Runs a benchmark, timing each of repeat runs and then measuring python's
+	peak memory on one more run (tracemalloc slows the code down so it is
+	kept out of the timed runs)
+	"""
+	def once(trace):
+		arg = setup()
+		gc.collect()
+		if trace:
+			tracemalloc.start()
+		start = time.perf_counter()
+		doc, objects = body(arg)
+		elapsed = time.perf_counter() - start
+		peak = 0
+		if trace:
+			peak = tracemalloc.get_traced_memory()[1]
+			tracemalloc.stop()
+		doc = doc or (arg[0] if isinstance(arg, tuple) else arg)
+		if doc is not None:
+			closeDocument(macro, doc)
+		return elapsed, peak, objects
+
+	times = []
+	# the macro is chatty, keep its output out of the table
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		for i in range(repeat):
+			elapsed, peak, objects = once(False)
+			times.append(elapsed)
+		elapsed, peak, objects = once(True)
+	return {
+		"time_ms": round(min(times) * 1000, 4),
+		"median_ms": round(statistics.median(times) * 1000, 4),
+		"py_peak_kb": round(peak / 1024, 1),
+		"objects": objects,
+	}
+
+def measureRss(backend, name):
+	"""
+	Runs one benchmark once in a fresh process (see rssChild) so that
+	nothing earlier has already raised the high water mark
+
+	Returns:
+		KiB the peak RSS grew by over the run, or None if it can't be measured
+	"""
+	out = subprocess.run(
+		[sys.executable, os.path.abspath(__file__), "rss", "--backend", backend, "--case", name],
+		capture_output=True, text=True
+	)
+	if out.returncode:
+		raise RuntimeError(f"measuring the memory of {name} failed:\n{out.stderr[-2000:]}")
+	return json.loads(out.stdout.strip().splitlines()[-1])["rss_kb"]
+
+def rssChild(backend, name):
+	# the other end of measureRss
+	macro, profiles, backend = loadMacro(backend)
+	setup, body = {n: (s, b) for n, s, b in benchmarks(macro, profiles, backend)}[name]
+	with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+		arg = setup()
+		gc.collect()
+		before = peakRss()
+		body(arg)
+		after = peakRss()
+	print(json.dumps({"rss_kb": None if before is None else after - before}))
+
+def runAll(backend, repeat, only=None):
+	macro, profiles, backend = loadMacro(backend)
+	results = {}
+	for name, setup, body in benchmarks(macro, profiles, backend):
+		if only and not any(name.startswith(o) for o in only):
+			continue
+		results[name] = measure(macro, setup, body, repeat)
+		results[name]["rss_kb"] = measureRss(backend, name)
+	return backend, results
+
+def gitCommit():
+	try:
+		out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+		return out.stdout.strip() or None
+	except OSError:
+		return None
+
+def baselinePath(backend):
+	return os.path.join(BASELINE_DIR, f"{backend}.json")
+
+def printResults(results):
+	print(f"{'benchmark':<28}{'min ms':>12}{'median ms':>12}{'RSS KiB':>12}{'py KiB':>12}{'objects':>10}")
+	for name, r in results.items():
+		rss = "-" if r["rss_kb"] is None else f"{r['rss_kb']:.0f}"
+		print(f"{name:<28}{r['time_ms']:>12.3f}{r['median_ms']:>12.3f}{rss:>12}{r['py_peak_kb']:>12.1f}{r['objects']:>10}")
+
+def isSlower(base, result, threshold, min_delta_ms):
+	dt = result["time_ms"] - base["time_ms"]
+	return dt > min_delta_ms and result["time_ms"] > base["time_ms"] * (1 + threshold)
+
+def compare(baseline, results, threshold, min_delta_ms, min_delta_kb):
+	"""
+	Compares results against a baseline
+
+	Time and memory regress when they grow by more than threshold (a
+	fraction), ignoring time changes smaller than min_delta_ms and RSS
+	changes smaller than min_delta_kb. Object counts are deterministic so
+	any increase is a regression.
+
+	Returns:
+		list of regression messages
+	"""
+	regressions = []
+	for name, r in results.items():
+		base = baseline["results"].get(name)
+		if base is None:
+			print(f"{name:<28}new benchmark, no baseline")
+			continue
+		if isSlower(base, r, threshold, min_delta_ms):
+			regressions.append(f"{name}: time {base['time_ms']:.3f} -> {r['time_ms']:.3f} ms")
+		if r["rss_kb"] is not None and base["rss_kb"] is not None:
+			if r["rss_kb"] - base["rss_kb"] > min_delta_kb and r["rss_kb"] > base["rss_kb"] * (1 + threshold):
+				regressions.append(f"{name}: RSS {base['rss_kb']:.0f} -> {r['rss_kb']:.0f} KiB")
+		if r["py_peak_kb"] > base["py_peak_kb"] * (1 + threshold):
+			regressions.append(f"{name}: python peak memory {base['py_peak_kb']:.1f} -> {r['py_peak_kb']:.1f} KiB")
+		if r["objects"] > base["objects"]:
+			regressions.append(f"{name}: objects {base['objects']} -> {r['objects']}")
+		change = (r["time_ms"] / base["time_ms"] - 1) * 100 if base["time_ms"] else 0
+		print(f"{name:<28}{base['time_ms']:>12.3f}{r['time_ms']:>12.3f}{change:>+10.1f}%")
+	return regressions
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Barn door build benchmarks")
+	parser.add_argument("command", choices=["run", "record", "compare", "rss"])
+	parser.add_argument("--backend", choices=["auto", "stub", "freecad"], default="auto")
+	parser.add_argument("--repeat", type=int, default=20, help="timed runs per benchmark")
+	parser.add_argument("--threshold", type=float, default=0.25, help="allowed fractional slowdown before flagging")
+	parser.add_argument("--min-delta-ms", type=float, help="ignore time changes smaller than this, default by backend (MIN_DELTA_MS)")
+	parser.add_argument("--min-delta-kb", type=float, default=1024, help="ignore RSS changes smaller than this")
+	parser.add_argument("--only", nargs="*", help="only run benchmarks starting with these names")
+	parser.add_argument("--case", help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.command == "rss":
+		# a child of measureRss
+		rssChild(args.backend, args.case)
+		return 0
+
+	backend, results = runAll(args.backend, args.repeat, args.only)
+	print(f"backend: {backend}")
+
+	if args.command == "run":
+		printResults(results)
+	elif args.command == "record":
+		printResults(results)
+		os.makedirs(BASELINE_DIR, exist_ok=True)
+		baseline = {
+			"schema": BASELINE_SCHEMA,
+			"backend": backend,
+			"commit": gitCommit(),
+			"python": platform.python_version(),
+			"machine": platform.machine(),
+			"repeat": args.repeat,
+			"results": results,
+		}
+		with open(baselinePath(backend), "w") as f:
+			json.dump(baseline, f, indent=2)
+			f.write("\n")
+		print(f"baseline written to {baselinePath(backend)}")
+	else:
+		path = baselinePath(backend)
+		if not os.path.exists(path):
+			print(f"no baseline at {path}, run record first")
+			return 2
+		with open(path) as f:
+			baseline = json.load(f)
+		if baseline.get("schema") != BASELINE_SCHEMA:
+			print(f"baseline schema {baseline.get('schema')} does not match {BASELINE_SCHEMA}, record a new one")
+			return 2
+		if args.min_delta_ms is None:
+			args.min_delta_ms = MIN_DELTA_MS[backend]
+		# timings of a millisecond or so are noisy, so give anything that
+		# looks slower a second run and keep the best of the two
+		suspects = [n for n, r in results.items() if n in baseline["results"] and isSlower(baseline["results"][n], r, args.threshold, args.min_delta_ms)]
+		if suspects:
+			backend, rerun = runAll(backend, args.repeat, suspects)
+			for name in suspects:
+				if rerun[name]["time_ms"] < results[name]["time_ms"]:
+					results[name] = rerun[name]
+		print(f"{'benchmark':<28}{'base ms':>12}{'now ms':>12}{'change':>11}")
+		regressions = compare(baseline, results, args.threshold, args.min_delta_ms, args.min_delta_kb)
+		if regressions:
+			print("\nREGRESSIONS:")
+			for r in regressions:
+				print("  " + r)
+			return 1
+		print("\nno regressions")
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
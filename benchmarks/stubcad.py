@@ -0,0 +1,278 @@
+import math
+import os
+import sys
+import types
+
+# A stand-in for the parts of the FreeCAD API that macro.py uses, so that the
+# build can be exercised (and timed) on a machine without FreeCAD. Nothing is
+# solved or meshed: sketches just record their geometry and constraints and
+# recompute only walks the document. Call install() before importing macro.
+
+class Vector:
+	def __init__(self, x=0, y=0, z=0):
+		self.x = x
+		self.y = y
+		self.z = z
+
+	def __add__(self, other):
+		return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+	def __sub__(self, other):
+		return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+	def __repr__(self):
+		return f"Vector ({self.x}, {self.y}, {self.z})"
+
+class Rotation:
+	# stored as a quaternion (x, y, z, w) like FreeCAD does
+	def __init__(self, *args):
+		if len(args) == 2:
+			axis, angle = args
+			length = math.sqrt(axis.x**2 + axis.y**2 + axis.z**2) or 1
+			half = math.radians(angle) / 2
+			s = math.sin(half) / length
+			self.Q = (axis.x * s, axis.y * s, axis.z * s, math.cos(half))
+		elif len(args) == 4:
+			self.Q = tuple(args)
+		else:
+			self.Q = (0, 0, 0, 1)
+
+	def multiply(self, other):
+		x1, y1, z1, w1 = self.Q
+		x2, y2, z2, w2 = other.Q
+		return Rotation(
+			w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+			w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+			w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+			w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+		)
+
+	def multVec(self, v):
+		x, y, z, w = self.Q
+		# v' = q v q^-1, expanded
+		tx = 2 * (y * v.z - z * v.y)
+		ty = 2 * (z * v.x - x * v.z)
+		tz = 2 * (x * v.y - y * v.x)
+		return Vector(
+			v.x + w * tx + (y * tz - z * ty),
+			v.y + w * ty + (z * tx - x * tz),
+			v.z + w * tz + (x * ty - y * tx)
+		)
+
+class Matrix:
+	# a 4x4 transform, given row by row
+	def __init__(self, *args):
+		self.A = tuple(args) if args else (1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+
+def _quaternion(m):
+	# the rotation of a matrix as (x, y, z, w), after Shepperd
+	r = [[m.A[4 * i + j] for j in range(3)] for i in range(3)]
+	trace = r[0][0] + r[1][1] + r[2][2]
+	if trace > 0:
+		s = 2 * math.sqrt(trace + 1)
+		return ((r[2][1] - r[1][2]) / s, (r[0][2] - r[2][0]) / s, (r[1][0] - r[0][1]) / s, s / 4)
+	i = max(range(3), key=lambda k: r[k][k])
+	j, k = (i + 1) % 3, (i + 2) % 3
+	s = 2 * math.sqrt(1 + r[i][i] - r[j][j] - r[k][k])
+	q = [0, 0, 0]
+	q[i] = s / 4
+	q[j] = (r[j][i] + r[i][j]) / s
+	q[k] = (r[k][i] + r[i][k]) / s
+	return (q[0], q[1], q[2], (r[k][j] - r[j][k]) / s)
+
+class Placement:
+	def __init__(self, base=None, rotation=None):
+		if isinstance(base, Matrix):
+			base, rotation = Vector(base.A[3], base.A[7], base.A[11]), Rotation(*_quaternion(base))
+		self.Base = base if base is not None else Vector()
+		self.Rotation = rotation if rotation is not None else Rotation()
+
+	def multiply(self, other):
+		return Placement(self.Base + self.Rotation.multVec(other.Base), self.Rotation.multiply(other.Rotation))
+
+class Quantity:
+	def __init__(self, value):
+		self.Value = float(str(value).split()[0])
+
+class Circle:
+	def __init__(self, center=None, normal=None, radius=1):
+		self.Center = center if center is not None else Vector()
+		self.Axis = normal if normal is not None else Vector(0, 0, 1)
+		self.Radius = radius
+
+class ArcOfCircle:
+	def __init__(self, circle, first, last):
+		self.Circle = circle
+		self.FirstParameter = first
+		self.LastParameter = last
+
+class LineSegment:
+	def __init__(self, start, end):
+		self.StartPoint = start
+		self.EndPoint = end
+
+class Constraint:
+	def __init__(self, kind, *args):
+		self.Type = kind
+		self.Args = args
+		self.Name = ""
+
+class DocumentObject:
+	def __init__(self, document, type_id, name):
+		self.Document = document
+		self.TypeId = type_id
+		self.Name = name
+		self.Label = name
+		self.Placement = Placement()
+		self.Visibility = True
+		# headless, like FreeCADCmd
+		self.ViewObject = None
+
+	@property
+	def InList(self):
+		# the objects that link to this one
+		return [o for o in self.Document.Objects if self in (getattr(o, "Profile", None), getattr(o, "Source", None))]
+
+	def touch(self):
+		pass
+
+	def recompute(self):
+		return True
+
+class SketchObject(DocumentObject):
+	def __init__(self, document, type_id, name):
+		super().__init__(document, type_id, name)
+		self.Geometry = []
+		self.Constraints = []
+		self.MapMode = 'Deactivated'
+
+	def addGeometry(self, geometry, construction=False):
+		self.Geometry.append(geometry)
+		return len(self.Geometry) - 1
+
+	def addConstraint(self, constraint):
+		self.Constraints.append(constraint)
+		return len(self.Constraints) - 1
+
+	def renameConstraint(self, index, name):
+		self.Constraints[index].Name = name
+
+	def _constraint(self, key):
+		if isinstance(key, int):
+			return self.Constraints[key]
+		for c in self.Constraints:
+			if c.Name == key:
+				return c
+		raise NameError(f"no constraint named {key}")
+
+	def setDatum(self, key, quantity):
+		self._constraint(key).Value = quantity
+
+	def getDatum(self, key):
+		return self._constraint(key).Value
+
+	def solve(self):
+		# 0 is success in FreeCAD
+		return 0
+
+class Document:
+	def __init__(self, name):
+		self.Name = name
+		self.Objects = []
+		self.RecomputeCount = 0
+
+	def addObject(self, type_id, name):
+		# FreeCAD makes names unique with a numeric suffix
+		names = {o.Name for o in self.Objects}
+		unique = name
+		n = 0
+		while unique in names:
+			n += 1
+			unique = f"{name}{n:03d}"
+		cls = SketchObject if type_id == "Sketcher::SketchObject" else DocumentObject
+		obj = cls(self, type_id, unique)
+		self.Objects.append(obj)
+		return obj
+
+	def getObject(self, name):
+		for o in self.Objects:
+			if o.Name == name:
+				return o
+		return None
+
+	def getObjectsByLabel(self, label):
+		return [o for o in self.Objects if o.Label == label]
+
+	def removeObject(self, name):
+		self.Objects = [o for o in self.Objects if o.Name != name]
+
+	def recompute(self):
+		self.RecomputeCount += 1
+		return len(self.Objects)
+
+_documents = {}
+
+def newDocument(name):
+	document = Document(name)
+	_documents[name] = document
+	App.ActiveDocument = document
+	return document
+
+def listDocuments():
+	return dict(_documents)
+
+def closeDocument(name):
+	document = _documents.pop(name, None)
+	if document is not None and App.ActiveDocument is document:
+		App.ActiveDocument = None
+
+def exportSVG(objects, path):
+	# write out the sketch geometry so the cost of serialising is counted
+	if not os.path.isdir(os.path.dirname(path)):
+		raise OSError(f"no such directory: {os.path.dirname(path)}")
+	paths = []
+	for obj in objects:
+		for g in getattr(obj, "Geometry", []):
+			if isinstance(g, LineSegment):
+				paths.append(f'<path d="M {g.StartPoint.x:.4f} {g.StartPoint.y:.4f} L {g.EndPoint.x:.4f} {g.EndPoint.y:.4f}"/>')
+			elif isinstance(g, ArcOfCircle):
+				c = g.Circle
+				sx = c.Center.x + c.Radius * math.cos(g.FirstParameter)
+				sy = c.Center.y + c.Radius * math.sin(g.FirstParameter)
+				ex = c.Center.x + c.Radius * math.cos(g.LastParameter)
+				ey = c.Center.y + c.Radius * math.sin(g.LastParameter)
+				paths.append(f'<path d="M {sx:.4f} {sy:.4f} A {c.Radius:.4f} {c.Radius:.4f} 0 0 1 {ex:.4f} {ey:.4f}"/>')
+			elif isinstance(g, Circle):
+				paths.append(f'<circle cx="{g.Center.x:.4f}" cy="{g.Center.y:.4f}" r="{g.Radius:.4f}"/>')
+	with open(path, "w") as f:
+		f.write('<svg xmlns="http://www.w3.org/2000/svg">\n' + "\n".join(paths) + "\n</svg>\n")
+
+def _module(name, **attrs):
+	module = types.ModuleType(name)
+	module.__dict__.update(attrs)
+	return module
+
+Base = _module("FreeCAD.Base", Vector=Vector, Rotation=Rotation, Placement=Placement, Matrix=Matrix)
+App = _module(
+	"FreeCAD",
+	Base=Base, Vector=Vector, Rotation=Rotation, Placement=Placement, Matrix=Matrix,
+	Units=_module("FreeCAD.Units", Quantity=Quantity),
+	GuiUp=0, ActiveDocument=None,
+	newDocument=newDocument, listDocuments=listDocuments, closeDocument=closeDocument,
+)
+
+def install():
+	"""
+	Registers the stub modules so that `import FreeCAD` and friends resolve to them
+	"""
+	sys.modules.update({
+		"FreeCAD": App,
+		"FreeCAD.Base": Base,
+		"Part": _module("Part", Circle=Circle, ArcOfCircle=ArcOfCircle, LineSegment=LineSegment),
+		"Sketcher": _module("Sketcher", Constraint=Constraint),
+		"FreeCADGui": _module("FreeCADGui", ActiveDocument=None, activateWorkbench=lambda name: None),
+		"importSVG": _module("importSVG", export=exportSVG),
+		"Draft": _module("Draft"),
+		"FastenerBase": _module("FastenerBase"),
+		"FastenersCmd": _module("FastenersCmd"),
+	})
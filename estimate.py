@@ -0,0 +1,83 @@
+import argparse
+
+import profiles
+
+# Estimates what it costs to have the flat parts laser or CNC cut, from
+# their profiles alone, no CAD needed.
+#
+#	python estimate.py                  one kit
+#	python estimate.py --kits 10        a batch of ten
+#
+# Lengths and areas are exact (see profiles.measure_profile). The machine
+# and stock figures below are defaults for a quote, override them on the
+# command line with what the shop charges.
+
+FEED_RATE = 20          # mm/s of cut
+PIERCE_TIME = 0.5       # s to start each cut
+MACHINE_RATE = 1.5      # per minute of machine time
+STOCK_PRICE = 40        # per m^2 of sheet at DISK_THICKNESS
+PART_SPACING = 5        # mm left round every part when nesting it on the sheet
+
+def estimate(kits=1, quantities=None, spacing=PART_SPACING):
+	"""
+	Measures every flat part once and rolls the figures up per kit and for
+	the batch
+
+	Args:
+		kits: how many kits in the batch
+		quantities: dict of part name to how many one kit needs, default profiles.PART_QUANTITIES
+		spacing: mm of stock left round every part
+
+	Returns:
+		dict of
+			parts: for each part, profiles.measure_profile figures plus
+				quantity and stock_area (with spacing) for one of it
+			kit, batch: totals of cut_length, pierces, area, stock_area and parts
+	"""
+	quantities = quantities or profiles.PART_QUANTITIES
+	parts = {}
+	kit = {"parts": 0, "cut_length": 0, "pierces": 0, "area": 0, "stock_area": 0}
+	for name, fn in profiles.FLAT_PARTS.items():
+		quantity = quantities.get(name, 0)
+		figures = profiles.measure_profile(fn())
+		xmin, ymin, xmax, ymax = figures["bounds"]
+		figures["stock_area"] = (xmax - xmin + spacing) * (ymax - ymin + spacing)
+		figures["quantity"] = quantity
+		parts[name] = figures
+		kit["parts"] += quantity
+		for k in ("cut_length", "pierces", "area", "stock_area"):
+			kit[k] += quantity * figures[k]
+	batch = {k: kits * v for k, v in kit.items()}
+	return {"parts": parts, "kit": kit, "batch": batch}
+
+def jobCost(totals, feed_rate=FEED_RATE, pierce_time=PIERCE_TIME, machine_rate=MACHINE_RATE, stock_price=STOCK_PRICE):
+	"""
+	Returns (machine minutes, machine cost, stock cost) for a kit or batch
+	total from estimate()
+	"""
+	minutes = (totals["cut_length"] / feed_rate + totals["pierces"] * pierce_time) / 60
+	return minutes, minutes * machine_rate, totals["stock_area"] / 1e6 * stock_price
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Estimate cut length, area and cost of the flat parts")
+	parser.add_argument("--kits", type=int, default=1, help="kits in the batch")
+	parser.add_argument("--feed-rate", type=float, default=FEED_RATE, help="mm/s")
+	parser.add_argument("--pierce-time", type=float, default=PIERCE_TIME, help="s per pierce")
+	parser.add_argument("--machine-rate", type=float, default=MACHINE_RATE, help="cost per minute")
+	parser.add_argument("--stock-price", type=float, default=STOCK_PRICE, help="cost per m^2")
+	parser.add_argument("--spacing", type=float, default=PART_SPACING, help="mm of stock round every part")
+	args = parser.parse_args(argv)
+
+	result = estimate(args.kits, spacing=args.spacing)
+	print(f"{'part':<18}{'qty':>5}{'cut mm':>11}{'pierces':>9}{'area mm2':>12}{'stock mm2':>12}{'used':>7}")
+	for name, p in result["parts"].items():
+		print(f"{name:<18}{p['quantity']:>5}{p['cut_length']:>11.1f}{p['pierces']:>9}{p['area']:>12.1f}{p['stock_area']:>12.1f}{p['area'] / p['stock_area']:>7.0%}")
+	print()
+	print(f"{'':<18}{'parts':>7}{'cut m':>9}{'pierces':>9}{'area m2':>10}{'stock m2':>10}{'minutes':>9}{'machine':>9}{'stock':>8}{'total':>9}")
+	for label, totals in (("per kit", result["kit"]), (f"{args.kits} kits", result["batch"])):
+		minutes, machine, stock = jobCost(totals, args.feed_rate, args.pierce_time, args.machine_rate, args.stock_price)
+		print(f"{label:<18}{totals['parts']:>7}{totals['cut_length'] / 1000:>9.2f}{totals['pierces']:>9}{totals['area'] / 1e6:>10.4f}{totals['stock_area'] / 1e6:>10.4f}{minutes:>9.1f}{machine:>9.2f}{stock:>8.2f}{machine + stock:>9.2f}")
+	return 0
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,338 @@
+import math
+
+# Rigid body motion and collision checking for tessellated parts, in plain
+# python so that it runs without FreeCAD. macro.py tessellates the parts
+# once, this module builds a bounding volume hierarchy (BVH) over each mesh
+# once and then every frame of a sweep only moves points and boxes.
+#
+# Points are (x, y, z) tuples and a transform is (R, t) with R a 3x3 tuple
+# of rows, mapping p to R p + t.
+
+# surfaces closer than this (mm) are in contact
+CONTACT_TOLERANCE = 0.01
+# triangles per BVH leaf
+LEAF_SIZE = 4
+
+def _sub(a, b):
+	return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+def _dot(a, b):
+	return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+def _cross(a, b):
+	return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+def rotation_about_axis(point, direction, degrees):
+	"""
+	Returns the transform that turns space by degrees about the axis through
+	point along direction (right handed, anticlockwise looking down the axis)
+	"""
+	length = math.sqrt(_dot(direction, direction))
+	x, y, z = (d / length for d in direction)
+	a = math.radians(degrees)
+	c, s = math.cos(a), math.sin(a)
+	C = 1 - c
+	R = (
+		(c + x * x * C, x * y * C - z * s, x * z * C + y * s),
+		(y * x * C + z * s, c + y * y * C, y * z * C - x * s),
+		(z * x * C - y * s, z * y * C + x * s, c + z * z * C),
+	)
+	# keep point fixed: t = point - R point
+	return (R, _sub(point, apply(R, (0, 0, 0), point)))
+
+def apply(R, t, p):
+	return (
+		R[0][0] * p[0] + R[0][1] * p[1] + R[0][2] * p[2] + t[0],
+		R[1][0] * p[0] + R[1][1] * p[1] + R[1][2] * p[2] + t[1],
+		R[2][0] * p[0] + R[2][1] * p[1] + R[2][2] * p[2] + t[2],
+	)
+
+def transform_box(transform, box):
+	# the axis aligned box around a moved box
+	R, t = transform
+	lo, hi = box
+	corners = [apply(R, t, (x, y, z)) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+	return (tuple(min(c[i] for c in corners) for i in range(3)), tuple(max(c[i] for c in corners) for i in range(3)))
+
+def _box(points):
+	return (tuple(min(p[i] for p in points) for i in range(3)), tuple(max(p[i] for p in points) for i in range(3)))
+
+def box_gap(a, b):
+	# distance between two boxes, 0 if they overlap
+	d = 0
+	for i in range(3):
+		g = max(a[0][i] - b[1][i], b[0][i] - a[1][i], 0)
+		d += g * g
+	return math.sqrt(d)
+
+def point_triangle_distance(p, a, b, c):
+	"""
+	Returns the distance from p to the triangle abc (closest point by
+	Voronoi region, after Ericson's Real-Time Collision Detection)
+	"""
+	ab, ac, ap = _sub(b, a), _sub(c, a), _sub(p, a)
+	d1, d2 = _dot(ab, ap), _dot(ac, ap)
+	if d1 <= 0 and d2 <= 0:
+		q = a
+	else:
+		bp = _sub(p, b)
+		d3, d4 = _dot(ab, bp), _dot(ac, bp)
+		cp = _sub(p, c)
+		d5, d6 = _dot(ab, cp), _dot(ac, cp)
+		vc = d1 * d4 - d3 * d2
+		vb = d5 * d2 - d1 * d6
+		va = d3 * d6 - d5 * d4
+		if d3 >= 0 and d4 <= d3:
+			q = b
+		elif d6 >= 0 and d5 <= d6:
+			q = c
+		elif vc <= 0 and d1 >= 0 and d3 <= 0:
+			v = d1 / (d1 - d3)
+			q = (a[0] + v * ab[0], a[1] + v * ab[1], a[2] + v * ab[2])
+		elif vb <= 0 and d2 >= 0 and d6 <= 0:
+			w = d2 / (d2 - d6)
+			q = (a[0] + w * ac[0], a[1] + w * ac[1], a[2] + w * ac[2])
+		elif va <= 0 and (d4 - d3) >= 0 and (d5 - d6) >= 0:
+			w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+			q = (b[0] + w * (c[0] - b[0]), b[1] + w * (c[1] - b[1]), b[2] + w * (c[2] - b[2]))
+		else:
+			denom = 1 / (va + vb + vc)
+			v, w = vb * denom, vc * denom
+			q = (a[0] + ab[0] * v + ac[0] * w, a[1] + ab[1] * v + ac[1] * w, a[2] + ab[2] * v + ac[2] * w)
+	d = _sub(p, q)
+	return math.sqrt(_dot(d, d))
+
+def segment_distance(p1, q1, p2, q2):
+	"""
+	Returns the distance between the segments p1q1 and p2q2 (closest points
+	by clamped parameters, after Ericson's Real-Time Collision Detection)
+	"""
+	d1, d2, r = _sub(q1, p1), _sub(q2, p2), _sub(p1, p2)
+	a, e, f = _dot(d1, d1), _dot(d2, d2), _dot(d2, r)
+	if a <= 1e-12 and e <= 1e-12:
+		s = t = 0
+	elif a <= 1e-12:
+		s, t = 0, min(max(f / e, 0), 1)
+	else:
+		c = _dot(d1, r)
+		if e <= 1e-12:
+			s, t = min(max(-c / a, 0), 1), 0
+		else:
+			b = _dot(d1, d2)
+			denom = a * e - b * b
+			# parallel segments have no unique closest pair, any s will do
+			s = min(max((b * f - c * e) / denom, 0), 1) if denom > 1e-12 else 0
+			t = (b * s + f) / e
+			if t < 0:
+				s, t = min(max(-c / a, 0), 1), 0
+			elif t > 1:
+				s, t = min(max((b - c) / a, 0), 1), 1
+	d = _sub(
+		(p1[0] + d1[0] * s, p1[1] + d1[1] * s, p1[2] + d1[2] * s),
+		(p2[0] + d2[0] * t, p2[1] + d2[1] * t, p2[2] + d2[2] * t)
+	)
+	return math.sqrt(_dot(d, d))
+
+def segment_hits_triangle(p, q, a, b, c):
+	# Moller-Trumbore, limited to the segment pq
+	d = _sub(q, p)
+	e1, e2 = _sub(b, a), _sub(c, a)
+	h = _cross(d, e2)
+	det = _dot(e1, h)
+	if abs(det) < 1e-12:
+		return False
+	f = 1 / det
+	s = _sub(p, a)
+	u = f * _dot(s, h)
+	if u < 0 or u > 1:
+		return False
+	k = _cross(s, e1)
+	v = f * _dot(d, k)
+	if v < 0 or u + v > 1:
+		return False
+	t = f * _dot(e2, k)
+	return 0 <= t <= 1
+
+class MeshBVH:
+	"""
+	A triangle mesh with a bounding volume hierarchy of axis aligned boxes,
+	built once and then checked against another mesh from any pose (see
+	clearance)
+
+	Args:
+		points: list of (x, y, z)
+		triangles: list of (i, j, k) indices into points
+	"""
+	def __init__(self, points, triangles):
+		self.points = [tuple(p) for p in points]
+		self.triangles = [(self.points[i], self.points[j], self.points[k]) for i, j, k in triangles]
+		self.boxes = [_box(t) for t in self.triangles]
+		# nodes are (box, left, right, first, last) where leaves have no
+		# children and cover order[first:last]
+		self.order = list(range(len(self.triangles)))
+		self.nodes = []
+		if self.triangles:
+			self._build(0, len(self.order))
+		self.box = self.nodes[0][0] if self.nodes else ((0, 0, 0), (0, 0, 0))
+
+	def _build(self, first, last):
+		index = len(self.nodes)
+		box = _box([p for n in self.order[first:last] for p in self.triangles[n]])
+		self.nodes.append(None)
+		if last - first <= LEAF_SIZE:
+			self.nodes[index] = (box, None, None, first, last)
+			return index
+		# split at the median centroid along the longest side
+		axis = max(range(3), key=lambda i: box[1][i] - box[0][i])
+		self.order[first:last] = sorted(self.order[first:last], key=lambda n: sum(p[axis] for p in self.triangles[n]))
+		middle = (first + last) // 2
+		left = self._build(first, middle)
+		right = self._build(middle, last)
+		self.nodes[index] = (box, left, right, first, last)
+		return index
+
+def triangles_cross(a, b):
+	# whether an edge of either triangle passes through the other
+	for i in range(3):
+		if segment_hits_triangle(a[i], a[i - 1], *b) or segment_hits_triangle(b[i], b[i - 1], *a):
+			return True
+	return False
+
+def _axis_gap(a, b):
+	# how far apart the triangles a and b are along the line between their
+	# centres, a bound on the distance between them that is much closer
+	# than their boxes' for long thin triangles
+	u = tuple(sum(p[i] for p in b) - sum(p[i] for p in a) for i in range(3))
+	length = math.sqrt(_dot(u, u))
+	if length <= 1e-12:
+		return 0
+	return (min(_dot(u, p) for p in b) - max(_dot(u, p) for p in a)) / length
+
+def _apart_distance(a, b):
+	# triangles that don't cross are closest either at a vertex of one and
+	# the face of the other or at an edge of each
+	best = min(min(point_triangle_distance(p, *b) for p in a), min(point_triangle_distance(p, *a) for p in b))
+	for i in range(3):
+		for j in range(3):
+			best = min(best, segment_distance(a[i], a[i - 1], b[j], b[j - 1]))
+	return best
+
+def triangle_distance(a, b):
+	"""
+	Returns the distance between the triangles a and b, each a tuple of
+	three points, 0 if they cross
+	"""
+	return 0.0 if triangles_cross(a, b) else _apart_distance(a, b)
+
+def clearance(moving, static, transform, best=math.inf):
+	"""
+	Returns the gap between a moving mesh (at transform) and a static one,
+	or best if they are no closer than that. 0 means they touch or cross.
+
+	The two hierarchies are walked together, nearest boxes first, and only
+	the triangles in leaves closer than the best gap so far are compared
+	(see triangle_distance), so the gap is exact to within the tessellation.
+	"""
+	if not moving.nodes or not static.nodes:
+		return best
+	R, t = transform
+	# the moving mesh's boxes and triangles, moved, as they are needed
+	boxes = {}
+	triangles = {}
+
+	def moved_box(index):
+		if index not in boxes:
+			boxes[index] = transform_box(transform, moving.nodes[index][0])
+		return boxes[index]
+
+	def moved_triangle(n):
+		if n not in triangles:
+			triangle = tuple(apply(R, t, p) for p in moving.triangles[n])
+			triangles[n] = (triangle, _box(triangle))
+		return triangles[n]
+
+	stack = [(0, 0)]
+	while stack:
+		m, s = stack.pop()
+		if box_gap(moved_box(m), static.nodes[s][0]) >= best:
+			continue
+		m_box, m_left, m_right, m_first, m_last = moving.nodes[m]
+		s_box, s_left, s_right, s_first, s_last = static.nodes[s]
+		if m_left is None and s_left is None:
+			for i in moving.order[m_first:m_last]:
+				a, a_box = moved_triangle(i)
+				if box_gap(a_box, s_box) >= best:
+					continue
+				for j in static.order[s_first:s_last]:
+					gap = box_gap(a_box, static.boxes[j])
+					if gap >= best:
+						continue
+					b = static.triangles[j]
+					# triangles with separate boxes can't cross
+					if gap <= 0 and triangles_cross(a, b):
+						return 0.0
+					if _axis_gap(a, b) >= best:
+						continue
+					best = min(best, _apart_distance(a, b))
+					if best <= CONTACT_TOLERANCE:
+						return 0.0
+			continue
+		# split whichever node holds more triangles
+		if s_left is None or (m_left is not None and m_last - m_first >= s_last - s_first):
+			pairs = [(m_left, s), (m_right, s)]
+		else:
+			pairs = [(m, s_left), (m, s_right)]
+		# the nearer pair goes on top so the best gap shrinks sooner
+		pairs.sort(key=lambda pair: -box_gap(moved_box(pair[0]), static.nodes[pair[1]][0]))
+		stack += pairs
+	return best
+
+def turning(point, direction, angles):
+	"""
+	Returns the frames of a turn about an axis through point along
+	direction, as a list of (angle, transform) for each of angles (degrees)
+	"""
+	return [(a, rotation_about_axis(point, direction, a)) for a in angles]
+
+def sweep(moving, static, frames, on_frame=None, ignore=()):
+	"""
+	Moves the moving meshes through a series of frames and checks them
+	against the static ones at every frame
+
+	Args:
+		moving: dict of name to MeshBVH, at angle 0
+		static: dict of name to MeshBVH
+		frames: list of (angle, transform), see turning
+		on_frame: called with (index, angle) before each frame is checked
+		ignore: (moving, static) pairs of names that touch by design and
+			are not checked
+
+	Returns:
+		dict of
+			first_collision: {"angle", "moving", "static"} or None
+			clearance: for every part, {"distance", "angle", "other"} at its
+				closest to any part on the other side
+	"""
+	ignore = set(ignore)
+	pairs = {(m, s): {"distance": math.inf, "angle": None} for m in moving for s in static if (m, s) not in ignore}
+	first_collision = None
+	for index, (angle, transform) in enumerate(frames):
+		if on_frame:
+			on_frame(index, angle)
+		for (m, s), closest in pairs.items():
+			# a pair that has touched can get no closer
+			if closest["distance"] <= 0:
+				continue
+			d = clearance(moving[m], static[s], transform, closest["distance"])
+			if d < closest["distance"]:
+				closest["distance"] = d
+				closest["angle"] = angle
+			if d <= 0 and first_collision is None:
+				first_collision = {"angle": angle, "moving": m, "static": s}
+
+	parts = {}
+	for (m, s), closest in pairs.items():
+		for name, other in ((m, s), (s, m)):
+			if name not in parts or closest["distance"] < parts[name]["distance"]:
+				parts[name] = {"distance": closest["distance"], "angle": closest["angle"], "other": other}
+	return {"first_collision": first_collision, "clearance": parts}
@@ -5,24 +5,51 @@ import math
 import Draft
 from FreeCAD import Base
 import FreeCADGui
-import FastenerBase
-import FastenersCmd
+if App.GuiUp:
+	# the fasteners workbench needs the GUI, leave it out of headless workers
+	import FastenerBase
+	import FastenersCmd
 import Sketcher  # Added this import
-import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import time
 import importSVG
 
+# the pure geometry lives next to this macro in profiles.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from profiles import (
+	DISK_THICKNESS,
+	EQ_PLATE_LENGTH, EQ_PLATE_WIDTH, EQ_PIN_INSET,
+	ALT_AXIS_SECTIONS, AZ_AXLE_SECTIONS, AZ_CLAMP_BOLT_SECTIONS, EQ_AXIS_SECTIONS,
+	slot_profile, bolt_profile, validate_loop, validate_profile, ProfileError,
+	top_az_disk_profile, bottom_az_disk_profile, az_flange_profile, alt_flange_profile,
+	eq_base_profile, eq_base_flange_profile, eq_flap_profile,
+)
+import kinematics
+
 DOCUMENT_NAME="BarnDoor"
-# Dimensions in mm
-DISK_DIAMETER = 100
-DISK_THICKNESS = 6
-TAPPING_SIZE_10 = 8.5
-TAPPING_SIZE_8 = 6.8
-TAPPING_SIZE_6 = 5
-SLOT_RADIUS = 45
-SLOT_WIDTH=6
+# the eq assembly was laid out for 100 x 50 plates with the pin 12.5 in,
+# these move it to suit the plate and pin dimensions in profiles.py
+EQ_PIN_Y = -EQ_PLATE_LENGTH / 2 + EQ_PIN_INSET
+EQ_PIN_SHIFT = EQ_PIN_Y + 37.5
+EQ_SIDE_SHIFT = (EQ_PLATE_WIDTH - 50) / 2
+# where exportSketch writes the SVG of each flat part
+EXPORT_DIR = os.path.join(os.path.expanduser("~"), "barndoor", "cad-barndoor")
+
+# set BARNDOOR_PARALLEL=1 (or this to True) to build the parts in parallel
+# FreeCADCmd worker processes, see buildParallel
+PARALLEL_BUILD = os.environ.get("BARNDOOR_PARALLEL") == "1"
 
 # global variable to hold the document
 doc = None
+# the object made by each of PARTS, by part name
+partObjects = {}
+# the colour and transparency asked of each object by name, kept so they
+# survive a headless build (see setViewStyle)
+viewStyles = {}
 
 # screw_maker = FastenersCmd.screwMaker
 def exportSketch(sketch):
@@ -40,13 +67,12 @@ def exportSketch(sketch):
 		sketch.Placement = default_placement
 		doc.recompute()  # Ensure the change takes effect
 
-		# Use the user's home directory to ensure write permissions
-		home_dir = os.path.expanduser("~")
-		path = os.path.join(home_dir, "barndoor", "cad-barndoor", f"{sketch.Name}.svg")
+		path = os.path.join(EXPORT_DIR, f"{sketch.Name}.svg")
 		importSVG.export(__objs__, path)
 	except Exception as e:
 		print(f"Export error: {str(e)}")
 		# Try alternative location directly in home directory
+		home_dir = os.path.expanduser("~")
 		alt_path = os.path.join(home_dir, f"{sketch.Name}.svg")
 		print(f"Trying alternative path: {alt_path}")
 		try:
@@ -60,80 +86,65 @@ def exportSketch(sketch):
 
 
 def cutSlot(sketch, slot_width=6, cx=0, cy=0, slot_radius=40, start_angle=0, end_angle=180, direction=True):
-	# Convert angles to radians
-	sa = math.radians(start_angle)
-	ea = math.radians(end_angle)
-
-	# Calculate the outer and inner radii
-	outer_radius = slot_radius
-	inner_radius = slot_radius - slot_width
-
-	# Calculate the points for the outer arc
-	outer_start_x = cx + outer_radius * math.cos(sa)
-	outer_start_y = cy + outer_radius * math.sin(sa)
-	outer_end_x = cx + outer_radius * math.cos(ea)
-	outer_end_y = cy + outer_radius * math.sin(ea)
-
-	# Calculate the points for the inner arc
-	inner_start_x = cx + inner_radius * math.cos(sa)
-	inner_start_y = cy + inner_radius * math.sin(sa)
-	inner_end_x = cx + inner_radius * math.cos(ea)
-	inner_end_y = cy + inner_radius * math.sin(ea)
-
-	# Calculate the centers for the end cap arcs
-	end_cap_center_x = (outer_end_x + inner_end_x) / 2
-	end_cap_center_y = (outer_end_y + inner_end_y) / 2
-
-	start_cap_center_x = (outer_start_x + inner_start_x) / 2
-	start_cap_center_y = (outer_start_y + inner_start_y) / 2
-
-	# Define the slot profile as lines with arc connectors
-	# The connector type depends on the direction parameter
-	# 'a' for counterclockwise, 'c' for clockwise
-	oc = "c" if direction else "a"
-	ic = "a" if direction else "c"
-
-	slot_lines = [
-		# Outer arc
-		{
-			"sx": outer_start_x, "sy": outer_start_y,
-			"ex": outer_end_x, "ey": outer_end_y,
-			"cx": cx, "cy": cy,
-			"connector": oc,
-		},
-		{
-			"sx": outer_end_x, "sy": outer_end_y,
-			"ex": inner_end_x, "ey": inner_end_y,
-			"cx": end_cap_center_x, "cy": end_cap_center_y,
-			"connector": "a"
-		},
-		{
-			"sx": inner_start_x, "sy": inner_start_y,
-			"ex": inner_end_x, "ey": inner_end_y,
-			"cx": cx, "cy": cy,
-			"connector": ic,
-		},
-		{
-			"sx": inner_start_x, "sy": inner_start_y,
-			"ex": outer_start_x, "ey": outer_start_y,
-			"cx": start_cap_center_x, "cy": start_cap_center_y,
-			"connector": "a"
-		}
-	]
+	slot_lines = slot_profile(slot_width=slot_width, cx=cx, cy=cy, slot_radius=slot_radius, start_angle=start_angle, end_angle=end_angle, direction=direction)
 	drawShape(sketch, lines=slot_lines, name="slot")
 
 
 # makes a whole of a given radius in the given sketch
 # at the given centre x and y
-def makeHole(sketch, x=0, y=0, radius=5):
+# if a name is given the radius constraint is renamed to it
+def makeHole(sketch, x=0, y=0, radius=5, name=None):
 	hole = sketch.addGeometry(Part.Circle(
 		Base.Vector(x, y, 0),
 		Base.Vector(0, 0, 1),
 		radius
 	), False)
-	sketch.addConstraint(Sketcher.Constraint('Radius', hole, radius))
+	constraint = sketch.addConstraint(Sketcher.Constraint('Radius', hole, radius))
+	if name:
+		sketch.renameConstraint(constraint, name)
 	return hole
 
+def drawProfile(profile, name="shape"):
+	"""
+	Draws a flat part profile (see profiles.py) into a new sketch, after
+	checking it with validate_profile
+
+	Args:
+		profile: dict of outline, holes and slots
+		name: The name of the sketch
+	"""
+	problems = validate_profile(profile)
+	if problems:
+		raise ProfileError(name, problems)
+	outline = profile["outline"]
+	if isinstance(outline, dict):
+		sketch = doc.addObject('Sketcher::SketchObject', name)
+		sketch.MapMode = 'FlatFace'
+		makeHole(sketch, outline["x"], outline["y"], outline["r"], outline.get("name"))
+	else:
+		sketch = drawShape(lines=outline, name=name, validate=False)
+	for hole in profile["holes"]:
+		makeHole(sketch, hole["x"], hole["y"], hole["r"], hole.get("name"))
+	for slot in profile["slots"]:
+		drawShape(sketch, lines=slot, name="slot", validate=False)
+	return sketch
+
+def setViewStyle(obj, color=None, transparency=None):
+	"""
+	Sets the colour and transparency of an object in the 3D view
+
+	There is no ViewObject when running headless (FreeCADCmd) so the
+	style is only recorded in viewStyles there
+	"""
+	viewStyles[obj.Name] = {"color": color, "transparency": transparency}
+	view = getattr(obj, "ViewObject", None)
+	if view is None:
+		return
+	if color is not None:
+		view.ShapeColor = color
+	if transparency is not None:
+		view.Transparency = transparency
+
 def moveObject(obj, x=0, y=0, z=0):
 	"""
 	Moves any FreeCAD object by the specified amounts along each axis
@@ -241,12 +252,13 @@ def moveSketch(sketch, x=0, y=0, z=0):
 	sketch.Placement = new_placement
 
 
-def drawShape(sketch=None, lines=[], name="shape"):
+def drawShape(sketch=None, lines=[], name="shape", validate=True):
 	print("in drawshape")
-	# Validate input
-	if not lines or len(lines) < 2:
-		print("Error: At least 2 points are required to create a sketch")
-		return None
+	# Reject bad geometry before FreeCAD sees it
+	if validate:
+		problems = validate_loop(lines)
+		if problems:
+			raise ProfileError(name, problems)
 
 	if not sketch:
 		sketch = doc.addObject("Sketcher::SketchObject", name)
@@ -294,8 +306,12 @@ def drawShape(sketch=None, lines=[], name="shape"):
 				elif end_angle == start_angle:
 					end_angle -= 2 * math.pi  # Full circle case
 
-			# Create the arc directly using Part.ArcOfCircle
-			arc = Part.ArcOfCircle(circle, start_angle, end_angle)
+			# Create the arc directly using Part.ArcOfCircle, which always
+			# runs anticlockwise so a clockwise arc is made from its end
+			if is_ccw:
+				arc = Part.ArcOfCircle(circle, start_angle, end_angle)
+			else:
+				arc = Part.ArcOfCircle(circle, end_angle, start_angle)
 
 			# Add to sketch
 			geo_idx = sketch.addGeometry(arc)
@@ -322,40 +338,7 @@ def drawShape(sketch=None, lines=[], name="shape"):
 	return sketch
 
 def draw_bolt(sections, name="cylinder_profile", start_y=0):
-	profile_lines = []
-	current_y = start_y
-	prev_radius = None
-
-	# Process each section to create the profile
-	for i, section in enumerate(sections):
-		# Get diameter and length from the section
-		diameter = section.get('d', 10)  # Default to 10 if not specified
-		length = section.get('l', 10)    # Default to 10 if not specified
-		# Calculate radius
-		radius = diameter / 2
-
-		if i == 0:
-			# First line: from bottom center to bottom right of first section
-			profile_lines.append({"sx": 0, "sy": current_y, "ex": radius, "ey": current_y})
-		else:
-			# If this section has a different radius than the previous one,
-			# add a horizontal line to create a step
-			if radius != prev_radius:
-				profile_lines.append({"sx": prev_radius, "sy": current_y, "ex": radius, "ey": current_y})
-
-		# Line from bottom right to top right of this section
-		profile_lines.append({"sx": radius, "sy": current_y, "ex": radius, "ey": current_y + length})
-
-		# Update the current Y position
-		current_y += length
-		prev_radius = radius
-
-		# If this is the last section, add line from top right to top center
-		if i == len(sections) - 1:
-			profile_lines.append({"sx": radius, "sy": current_y, "ex": 0, "ey": current_y})
-
-	# Add closing line from top center back to bottom center
-	profile_lines.append({"sx": 0, "sy": current_y, "ex": 0, "ey": start_y})
+	profile_lines = bolt_profile(sections, start_y=start_y)
 
 	# Draw the profile using drawShape
 	sketch = drawShape(lines=profile_lines, name=name)
@@ -366,7 +349,7 @@ def draw_bolt(sections, name="cylinder_profile", start_y=0):
 	revolution.Axis = Base.Vector(0.0, 1.0, 0.0)  # Y axis
 	revolution.Base = Base.Vector(0.0, 0.0, 0.0)
 	revolution.Angle = 360.0
-	revolution.ViewObject.Transparency = 70
+	setViewStyle(revolution, transparency=70)
 	sketch.Visibility = False
 	doc.recompute()
 	# exportSketch(sketch)
@@ -410,26 +393,9 @@ def setConstraint(padName, constraintName, value, units):
 	sketch.setDatum(constraintName, App.Units.Quantity(str(value) + ' ' + units))
 
 def create_top_az_disk():
-	# Create a new sketch
-	sketch = doc.addObject('Sketcher::SketchObject', 'top_az_disk')
-	sketch.MapMode = 'FlatFace'
-	# Draw the main disk
-	disk = sketch.addGeometry(Part.Circle(Base.Vector(0, 0, 0), Base.Vector(0, 0, 1), DISK_DIAMETER / 2), False)
-	sketch.addConstraint(Sketcher.Constraint('Radius', disk, DISK_DIAMETER / 2))
-	sketch.renameConstraint(disk, u'top-az-disk-radius')
-	units = str(DISK_DIAMETER / 2) + ' mm'
-	sketch.setDatum(disk, App.Units.Quantity(units))
-	# Draw the center hole
-	hole = sketch.addGeometry(Part.Circle(Base.Vector(0, 0, 0), Base.Vector(0, 0, 1), 10 / 2), False)
-	sketch.addConstraint(Sketcher.Constraint('Radius', hole, 10 / 2))
-	sketch.renameConstraint(hole, u'top-az-hole-radius')
-	units = str(10 / 2) + ' mm'
-	sketch.setDatum(hole, App.Units.Quantity(units))
+	sketch = drawProfile(top_az_disk_profile(), name='top_az_disk')
 	# Ensure both circles are centered at the same point
-	sketch.addConstraint(Sketcher.Constraint('Coincident', disk, 3, hole, 3))
-	# Draw two semicircular slots
-	cutSlot(sketch, slot_width=SLOT_WIDTH, slot_radius=SLOT_RADIUS, start_angle=0, end_angle=90)
-	cutSlot(sketch, slot_width=SLOT_WIDTH, slot_radius=SLOT_RADIUS, start_angle=180, end_angle=270)
+	sketch.addConstraint(Sketcher.Constraint('Coincident', 0, 3, 1, 3))
 	# rotate the disk allowing for easier placement of later components
 	moveSketch(sketch, z=DISK_THICKNESS)
 	rotateSketch(sketch, angle=45)
@@ -440,67 +406,27 @@ def create_top_az_disk():
 	pad.Length = DISK_THICKNESS
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
+	setViewStyle(pad, color=(0.8, 0.8, 0.8))  # Light gray
 	doc.recompute()
 	exportSketch(sketch)
+	return pad
 
 def create_bottom_az_disk():
-	# Create a new sketch
-	sketch = doc.addObject('Sketcher::SketchObject', 'bottom_az_disk')
-	sketch.MapMode = 'FlatFace'
-
-	# Draw the main disk
-	disk = sketch.addGeometry(Part.Circle(Base.Vector(0, 0, 0), Base.Vector(0, 0, 1), DISK_DIAMETER / 2), False)
-	sketch.addConstraint(Sketcher.Constraint('Radius', disk, DISK_DIAMETER / 2))
-	sketch.renameConstraint(disk, u'bottom-az-disk-radius')
-	units = str(DISK_DIAMETER / 2) + ' mm'
-	sketch.setDatum(disk, App.Units.Quantity(units))
-
-	# Draw the center hole
-	hole = sketch.addGeometry(Part.Circle(Base.Vector(0, 0, 0), Base.Vector(0, 0, 1), 10 / 2), False)
-	sketch.addConstraint(Sketcher.Constraint('Radius', hole, TAPPING_SIZE_8 / 2))
-	sketch.renameConstraint(hole, u'bottom-az-hole-radius')
-	units = str(TAPPING_SIZE_8 / 2) + ' mm'
-	sketch.setDatum(hole, App.Units.Quantity(units))
+	sketch = drawProfile(bottom_az_disk_profile(), name='bottom_az_disk')
 	# Ensure both circles are centered at the same point
-	sketch.addConstraint(Sketcher.Constraint('Coincident', disk, 3, hole, 3))
-
-	# Draw 4 equidistant holes around a circle of radius 30mm
-	# These holes are for mounting to the tripod/pillar
-	MOUNT_HOLE_RADIUS = 4
-	MOUNT_THREAD_RADIUS = TAPPING_SIZE_6 / 2
-	MOUNT_HOLE_DISTANCE = 30
-	for i in range(4):
-		angle = i * 90
-		x = MOUNT_HOLE_DISTANCE * math.cos(math.radians(angle))
-		y = MOUNT_HOLE_DISTANCE * math.sin(math.radians(angle))
-		h = sketch.addGeometry(Part.Circle(Base.Vector(x, y, 0), Base.Vector(0, 0, 1), MOUNT_HOLE_RADIUS), False)
-		sketch.addConstraint(Sketcher.Constraint('Radius', h, MOUNT_HOLE_RADIUS))
-		#units = str(MOUNT_HOLE_RADIUS) + ' mm'
-
-	# az rotation bolt tightening holes
-	for i in range(2):
-		angle = (i * 180) + SLOT_RADIUS
-		#angle = i * 180
-		center_radius = SLOT_RADIUS - (SLOT_WIDTH/2)  # Position holes at center of slot width
-		x = center_radius * math.cos(math.radians(angle))
-		y = center_radius * math.sin(math.radians(angle))
-		makeHole(sketch, x=x, y=y, radius=MOUNT_THREAD_RADIUS)
-		# we're going to rotate the sketch by 45 degrees so
-		# we'll add the bolts in a pre-rotated orientation
-		x = center_radius * math.cos(math.radians(angle + 45))
-		y = center_radius * math.sin(math.radians(angle + 45))
-
+	sketch.addConstraint(Sketcher.Constraint('Coincident', 0, 3, 1, 3))
 	rotateSketch(sketch, angle=45)
+
 	# Extrude the sketch
 	pad = doc.addObject("PartDesign::Pad", "bottom-az-disk-pad")
 	pad.Profile = sketch
 	pad.Length = DISK_THICKNESS
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
+	setViewStyle(pad, color=(0.8, 0.8, 0.8))  # Light gray
 	doc.recompute()
 	exportSketch(sketch)
+	return pad
 
 def create_az_flange(number):
 	"""
@@ -509,41 +435,9 @@ def create_az_flange(number):
 	Args:
 		number: Flange number (1 or 2)
 	"""
+	profile = az_flange_profile()
 	width = 70
-	height = 70
-	hole_radius = 5.01
-	# Position the hole center 15mm from both edges (to leave enough material)
-	hole_x = 25
-	hole_y = height - 25
-	slot_radius = 20
-	cut = 20
-	arc_radius = 25
-
-	# Define the flange profile as lines with an arc in the top-left corner
-	flange_lines = [
-		# Bottom edge: bottom left to bottom right
-		{"sx": 0, "sy": 0, "ex": width, "ey": 0},
-
-		# Right edge: bottom right to top right before cut
-		{"sx": width, "sy": 0, "ex": width, "ey": height-cut},
-
-		# Cut edge: top right before cut to top right after cut
-		{"sx": width, "sy": height-cut, "ex": width-cut, "ey": height},
-
-		# Top edge: top right after cut to top left + arc_radius
-		{"sx": width-cut, "sy": height, "ex": arc_radius, "ey": height},
-
-		# Arc: from top edge to left edge (12 o'clock to 9 o'clock, anticlockwise)
-		{"sx": arc_radius, "sy": height, "ex": 0, "ey": height - arc_radius, "connector": "a", "cx": arc_radius, "cy": height - arc_radius},
-
-		# Left edge: arc end to bottom left
-		{"sx": 0, "sy": height - arc_radius, "ex": 0, "ey": 0}
-	]
-
-	# Draw the flange profile using drawShape
-	sketch = drawShape(lines=flange_lines, name="az_flange_" + str(number))
-	makeHole(sketch, hole_x, hole_y, hole_radius)
-	cutSlot(sketch, slot_width=SLOT_WIDTH, slot_radius=slot_radius, cx=hole_x, cy=hole_y, start_angle=250, end_angle=15)
+	sketch = drawProfile(profile, name="az_flange_" + str(number))
 
 	# Export the sketch before rotation for proper top view
 	exportSketch(sketch)
@@ -565,43 +459,14 @@ def create_az_flange(number):
 		pad.Reversed = True
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
-	pad.ViewObject.Transparency = 70
+	setViewStyle(pad, color=(0.8, 0.8, 0.8), transparency=70)  # Light gray
 
 	doc.recompute()
 	return pad
 
 def create_alt_flange(number):
-	# Define dimensions
-	height = 50      # rectangle height
 	width = 50       # rectangle width
-	hole_x = 25      # x position of the large hole
-	hole_y = 0       # y position of the large hole
-
-	# Define the flange profile as lines with an arc centered on the large hole
-	flange_lines = [
-		# Left edge: arc end to bottom left
-		{"sx": 0, "sy": hole_y, "ex": 0, "ey": -height/2},
-
-		# Bottom edge: bottom left to bottom right
-		{"sx": 0, "sy": -height/2, "ex": width, "ey": -height/2},
-
-		# Right edge: bottom right to top right
-		{"sx": width, "sy": -height/2, "ex": width, "ey": height/2},
-
-		# Top edge: top right to arc start
-		{"sx": width, "sy": height/2, "ex": hole_x, "ey": height/2},
-
-		# Arc: from top edge to left edge (12 o'clock to 9 o'clock, anticlockwise)
-		{"sx": hole_x, "sy": height/2, "ex": 0, "ey": hole_y, "connector": "a", "cx": hole_x, "cy": hole_y}
-	]
-
-	# Draw the flange profile using drawShape
-	sketch = drawShape(lines=flange_lines, name="alt_flange_" + str(number))
-
-	# Add holes to the sketch
-	makeHole(sketch, x=hole_x, y=hole_y, radius=5.01)
-	makeHole(sketch, x=hole_x + 20 - (SLOT_WIDTH/2), y=hole_y, radius=TAPPING_SIZE_6 / 2)
+	sketch = drawProfile(alt_flange_profile(), name="alt_flange_" + str(number))
 
 	# Export the sketch before rotation for proper top view
 	exportSketch(sketch)
@@ -624,38 +489,18 @@ def create_alt_flange(number):
 	pad.Length = DISK_THICKNESS
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
+	setViewStyle(pad, color=(0.8, 0.8, 0.8))  # Light gray
 	doc.recompute()
 	return pad
 
 def create_eq_base():
-	# Define dimensions
-	height = 50      # rectangle height
-	width = 100       # rectangle width
-
-	# Define the flange profile as lines with an arc centered on the large hole
-	lines = [
-        # Bottom edge: bottom left to bottom right
-        {"sx": 0, "sy": 0, "ex": width, "ey": 0},
-
-        # Right edge: bottom right to top right
-        {"sx": width, "sy": 0, "ex": width, "ey": height},
-
-        # Top edge: top right to top left
-        {"sx": width, "sy": height, "ex": 0, "ey": height},
-
-        # Left edge: top left to bottom left (closing line)
-        {"sx": 0, "sy": height, "ex": 0, "ey": 0}
-	]
-
-	# Draw the flange profile using drawShape
-	sketch = drawShape(lines=lines, name="eq_base")
+	sketch = drawProfile(eq_base_profile(), name="eq_base")
 
 	# Export the sketch before rotation for proper top view
 	exportSketch(sketch)
 
 	rotateSketch(sketch, plane='xy', angle=90)
-	moveSketch(sketch, x=15, y=-50, z=82)
+	moveSketch(sketch, x=15 + EQ_SIDE_SHIFT, y=-EQ_PLATE_LENGTH / 2, z=82)
 
 	# Create the pad
 	pad = doc.addObject("PartDesign::Pad", "eq_base_pad")
@@ -663,8 +508,7 @@ def create_eq_base():
 	pad.Length = DISK_THICKNESS
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
-	pad.ViewObject.Transparency = 70
+	setViewStyle(pad, color=(0.8, 0.8, 0.8), transparency=70)  # Light gray
 	doc.recompute()
 	return pad
 
@@ -673,42 +517,22 @@ def create_eq_base_flange(number):
 	height = 25      # rectangle height
 	width = 25       # rectangle width
 
-	# Define the flange profile as lines with an arc centered on the large hole
-	lines = [
-        # Bottom edge: bottom left to bottom right
-        {"sx": 0, "sy": 0, "ex": width, "ey": 0},
-
-        # Right edge: bottom right to top right
-        {"sx": width, "sy": 0, "ex": width, "ey": height / 2},
-
-        # Top edge radius
-        # {"sx": width, "sy": height, "ex": 0, "ey": height},
-		{"sx": width, "sy": height / 2, "ex": 0, "ey": height / 2, "connector": "c", "cx": width / 2, "cy": height / 2},
-
-        # Left edge: top left to bottom left (closing line)
-        {"sx": 0, "sy": height / 2, "ex": 0, "ey": 0}
-	]
-
-	# Draw the flange profile using drawShape
-	sketch = drawShape(lines=lines, name="eq_base_flange_" + str(number))
-	holeRad=TAPPING_SIZE_10/2
-
-	makeHole(sketch, x=width/2, y=height/2, radius=holeRad)
+	sketch = drawProfile(eq_base_flange_profile(), name="eq_base_flange_" + str(number))
 	# Export the sketch before rotation for proper top view
 	exportSketch(sketch)
 
 	rotateSketch(sketch, plane='xz', angle=90)
 	rotateSketch(sketch, plane='xy', angle=-90)
 	if number == 1:
-		moveSketch(sketch, x=15, y=-25, z=88)
+		moveSketch(sketch, x=15 + EQ_SIDE_SHIFT, y=-25 + EQ_PIN_SHIFT, z=88)
 	elif number == 2:
-		moveSketch(sketch, x=-29, y=-25, z=88)
+		moveSketch(sketch, x=-29 - EQ_SIDE_SHIFT, y=-25 + EQ_PIN_SHIFT, z=88)
 	elif number == 3:
 		rotateSketch(sketch, plane='xz', angle=180)
-		moveSketch(sketch, x=9, y=-25 - width, z=88 + height)
+		moveSketch(sketch, x=9 + EQ_SIDE_SHIFT, y=-25 - width + EQ_PIN_SHIFT, z=88 + height)
 	elif number == 4:
 		rotateSketch(sketch, plane='xz', angle=180)
-		moveSketch(sketch, x=-23, y=-25 - width, z=88 + height)
+		moveSketch(sketch, x=-23 - EQ_SIDE_SHIFT, y=-25 - width + EQ_PIN_SHIFT, z=88 + height)
 
 
 	# Create the pad
@@ -717,39 +541,18 @@ def create_eq_base_flange(number):
 	pad.Length = DISK_THICKNESS
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
-	# pad.ViewObject.Transparency = 70
+	setViewStyle(pad, color=(0.8, 0.8, 0.8))  # Light gray
 	doc.recompute()
 	return pad
 
 def create_eq_flap():
-	# Define dimensions
-	height = 50      # rectangle height
-	width = 100       # rectangle width
-
-	# Define the flange profile as lines with an arc centered on the large hole
-	lines = [
-        # Bottom edge: bottom left to bottom right
-        {"sx": 0, "sy": 0, "ex": width, "ey": 0},
-
-        # Right edge: bottom right to top right
-        {"sx": width, "sy": 0, "ex": width, "ey": height},
-
-        # Top edge: top right to top left
-        {"sx": width, "sy": height, "ex": 0, "ey": height},
-
-        # Left edge: top left to bottom left (closing line)
-        {"sx": 0, "sy": height, "ex": 0, "ey": 0}
-	]
-
-	# Draw the flange profile using drawShape
-	sketch = drawShape(lines=lines, name="eq_flap")
+	sketch = drawProfile(eq_flap_profile(), name="eq_flap")
 
 	# Export the sketch before rotation for proper top view
 	exportSketch(sketch)
 
 	rotateSketch(sketch, plane='xy', angle=90)
-	moveSketch(sketch, x=15, y=-50, z=113)
+	moveSketch(sketch, x=15 + EQ_SIDE_SHIFT, y=-EQ_PLATE_LENGTH / 2, z=113)
 
 	# Create the pad
 	pad = doc.addObject("PartDesign::Pad", "eq_flap_pad")
@@ -757,11 +560,57 @@ def create_eq_flap():
 	pad.Length = DISK_THICKNESS
 	sketch.Visibility = False
 	pad.Visibility = True
-	pad.ViewObject.ShapeColor = (0.8, 0.8, 0.8)  # Light gray
-	pad.ViewObject.Transparency = 50
+	setViewStyle(pad, color=(0.8, 0.8, 0.8), transparency=50)  # Light gray
 	doc.recompute()
 	return pad
 
+def create_alt_axis():
+	# create the central alt axis pin
+	alt_axis = draw_bolt(sections=ALT_AXIS_SECTIONS, name="alt_axis")
+	moveObject(alt_axis, x=-10, y=-30, z=57)
+	return alt_axis
+
+def create_az_axle():
+	# create the central az axis shoulder bolt
+	az_bolt = draw_bolt(sections=AZ_AXLE_SECTIONS, name="az_axle")
+	rotateObject(az_bolt, plane="xz", angle=90)
+	return az_bolt
+
+def create_az_clamp_bolt(number):
+	# make the az disk clamp bolts
+	bolt = draw_bolt(sections=AZ_CLAMP_BOLT_SECTIONS, name="az_clamp_bolt_" + str(number))
+	rotateObject(bolt, plane="xz", angle=90)
+	moveObject(bolt, y=42 if number == 1 else -42)
+	return bolt
+
+def create_eq_axis():
+	# create eq axis pin
+	eq_axis = draw_bolt(sections=EQ_AXIS_SECTIONS, name="alt_axis")
+	rotateObject(eq_axis, plane='xy', angle=90)
+	moveObject(eq_axis, x=20 + EQ_SIDE_SHIFT, y=EQ_PIN_Y, z=100.5)
+	return eq_axis
+
+# every part of the assembly, in build order, as (name, builder)
+PARTS = [
+	("alt_axis", create_alt_axis),
+	("az_axle", create_az_axle),
+	("az_clamp_bolt_1", lambda: create_az_clamp_bolt(1)),
+	("az_clamp_bolt_2", lambda: create_az_clamp_bolt(2)),
+	("top_az_disk", create_top_az_disk),
+	("bottom_az_disk", create_bottom_az_disk),
+	("az_flange_1", lambda: create_az_flange(1)),
+	("az_flange_2", lambda: create_az_flange(2)),
+	("alt_flange_1", lambda: create_alt_flange(1)),
+	("alt_flange_2", lambda: create_alt_flange(2)),
+	("eq_base", create_eq_base),
+	("eq_base_flange_1", lambda: create_eq_base_flange(1)),
+	("eq_base_flange_2", lambda: create_eq_base_flange(2)),
+	("eq_base_flange_3", lambda: create_eq_base_flange(3)),
+	("eq_base_flange_4", lambda: create_eq_base_flange(4)),
+	("eq_flap", create_eq_flap),
+	("eq_axis", create_eq_axis),
+]
+
 def deleteExistingDocument(name):
 	"""
 	Deletes any existing document with the specified name
@@ -775,44 +624,370 @@ def deleteExistingDocument(name):
 			App.closeDocument(name)
 			break
 
-try:
+def setAnimationEnabled(enabled):
+	# there is no active view when running headless
+	if App.GuiUp and FreeCADGui.ActiveDocument:
+		FreeCADGui.ActiveDocument.ActiveView.setAnimationEnabled(enabled)
+
+def build(name=DOCUMENT_NAME):
+	"""
+	Builds the whole assembly into a new document of the given name
+
+	Returns:
+		The new document
+	"""
+	global doc
 	# Delete existing document if it exists
-	deleteExistingDocument(DOCUMENT_NAME)
-	doc = App.newDocument(DOCUMENT_NAME)
-	FreeCADGui.ActiveDocument.ActiveView.setAnimationEnabled(False)
+	deleteExistingDocument(name)
+	doc = App.newDocument(name)
+	partObjects.clear()
+	setAnimationEnabled(False)
+	try:
+		for part_name, builder in PARTS:
+			partObjects[part_name] = builder()
+	finally:
+		setAnimationEnabled(True)
+	return doc
 
-	# create the central alt axis pin
-	alt_axis = draw_bolt(sections=[{"d": 10, "l": 2}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 54}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 2}], name="alt_axis")
-	moveObject(alt_axis, x=-10, y=-30, z=57)
+def partCosts():
+	"""
+	Returns the relative cost of building each part from the recorded
+	FreeCAD benchmark baseline (see benchmarks/bench.py), or equal costs
+	without one. The stub baseline is no guide as it only times our python.
+	"""
+	path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baselines", "freecad.json")
+	if not os.path.exists(path):
+		return {name: 1 for name, builder in PARTS}
+	with open(path) as f:
+		results = json.load(f)["results"]
+	return {name: results.get("part:" + name, {}).get("time_ms", 1) for name, builder in PARTS}
+
+def partitionParts(workers, costs=None):
+	"""
+	Splits PARTS into at most the given number of groups of roughly equal
+	cost, longest first onto the least loaded group
 
-	# create the central az axis shoulder bolt
-	az_bolt = draw_bolt(sections=[{"d": TAPPING_SIZE_8, "l": 6},{"d": 10, "l": 6},{"d": 16, "l": 3}], name="az_axle")
-	rotateObject(az_bolt, plane="xz", angle=90)
+	Returns:
+		list of lists of part names
+	"""
+	costs = costs or partCosts()
+	groups = [[] for i in range(max(1, min(workers, len(PARTS))))]
+	loads = [0] * len(groups)
+	for name in sorted((name for name, builder in PARTS), key=lambda n: -costs.get(n, 1)):
+		i = loads.index(min(loads))
+		groups[i].append(name)
+		loads[i] += costs.get(name, 1)
+	return groups
+
+def findFreeCADCmd():
+	# the headless FreeCAD, next to this one or on the PATH
+	names = ["FreeCADCmd", "freecadcmd", "FreeCADCmd.exe"]
+	dirs = [os.path.join(App.getHomePath(), "bin"), os.path.dirname(sys.executable)]
+	for d in dirs:
+		for name in names:
+			path = os.path.join(d, name)
+			if os.path.isfile(path) and os.access(path, os.X_OK):
+				return path
+	for name in names:
+		path = shutil.which(name)
+		if path:
+			return path
+	return None
 
-	# make the az disk clamp bolts
-	az_clamp_bolt_1 = draw_bolt(sections=[{"d": TAPPING_SIZE_6, "l": 6},{"d": 6, "l": 6},{"d": 10, "l": 5}], name="az_clamp_bolt_1")
-	rotateObject(az_clamp_bolt_1, plane="xz", angle=90)
-	moveObject(az_clamp_bolt_1, y=42)
-	az_clamp_bolt_2 = draw_bolt(sections=[{"d": TAPPING_SIZE_6, "l": 6},{"d": 6, "l": 6},{"d": 10, "l": 5}], name="az_clamp_bolt_2")
-	rotateObject(az_clamp_bolt_2, plane="xz", angle=90)
-	moveObject(az_clamp_bolt_2, y=-42)
-	# now create the azimuth disks
-	create_top_az_disk()
-	create_bottom_az_disk()
-	create_az_flange(1)
-	create_az_flange(2)
-	create_alt_flange(1)
-	create_alt_flange(2)
-	create_eq_base()
-	create_eq_base_flange(1)
-	create_eq_base_flange(2)
-	create_eq_base_flange(3)
-	create_eq_base_flange(4)
-	create_eq_flap()
-	# create eq axis pin
-	eq_axis = draw_bolt(sections=[{"d": 10, "l": 2}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 54}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 2}], name="alt_axis")
-	rotateObject(eq_axis, plane='xy', angle=90)
-	moveObject(eq_axis, x=20, y=-37.5, z=100.5)
-	FreeCADGui.ActiveDocument.ActiveView.setAnimationEnabled(True)
-except Exception as e:
-	print(f"Main execution error: {str(e)}")
\ No newline at end of file
+def buildWorker(names, out_dir):
+	"""
+	Builds the named parts into a scratch document and writes each one's
+	shape to <out_dir>/<name>.brep, with its label and view style in
+	<out_dir>/<name>.json. Run in FreeCADCmd by buildParallel.
+	"""
+	global doc
+	doc = App.newDocument("BarnDoorWorker")
+	builders = dict(PARTS)
+	for name in names:
+		obj = builders[name]()
+		doc.recompute()
+		# the shape carries the part's placement with it
+		obj.Shape.exportBrep(os.path.join(out_dir, name + ".brep"))
+		with open(os.path.join(out_dir, name + ".json"), "w") as f:
+			json.dump({"label": obj.Label, "style": viewStyles.get(obj.Name)}, f)
+	App.closeDocument(doc.Name)
+
+def buildParallel(name=DOCUMENT_NAME, workers=None):
+	"""
+	Builds the assembly with the parts shared out between FreeCADCmd worker
+	processes, which hand back BREP shapes that are loaded into the new
+	document as plain Part features in their final placements.
+
+	The result is not parametric (there are no sketches or pads to edit),
+	use build() for that. Falls back to build() if FreeCADCmd can't be found.
+
+	Args:
+		name: The name of the new document
+		workers: number of worker processes, default one per CPU
+
+	Returns:
+		The new document
+	"""
+	global doc
+	command = findFreeCADCmd()
+	if not command:
+		print("FreeCADCmd not found, building serially")
+		return build(name)
+
+	out_dir = tempfile.mkdtemp(prefix="barndoor-")
+	procs = []
+	try:
+		groups = partitionParts(workers or os.cpu_count() or 1)
+		for group in groups:
+			env = dict(os.environ, BARNDOOR_WORKER_PARTS=",".join(group), BARNDOOR_WORKER_OUT=out_dir)
+			# the worker has to run the macro, not just import it. FreeCADCmd
+			# imports it as the module "macro", which runs the build code at
+			# the bottom and that sees BARNDOOR_WORKER_PARTS
+			env.pop("BARNDOOR_IMPORT_ONLY", None)
+			proc = subprocess.Popen(
+				[command, os.path.abspath(__file__)],
+				env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+			)
+			procs.append((group, proc))
+
+		# get the document ready while the workers run
+		deleteExistingDocument(name)
+		doc = App.newDocument(name)
+		setAnimationEnabled(False)
+
+		for group, proc in procs:
+			output = proc.communicate()[0]
+			missing = [n for n in group if not os.path.exists(os.path.join(out_dir, n + ".brep"))]
+			if proc.returncode or missing:
+				raise RuntimeError(f"worker for {', '.join(group)} failed:\n{output[-2000:]}")
+
+		# load them in the usual build order
+		partObjects.clear()
+		for part_name, builder in PARTS:
+			with open(os.path.join(out_dir, part_name + ".json")) as f:
+				info = json.load(f)
+			obj = doc.addObject("Part::Feature", part_name)
+			obj.Shape = Part.read(os.path.join(out_dir, part_name + ".brep"))
+			obj.Label = info["label"]
+			partObjects[part_name] = obj
+			style = info["style"]
+			if style:
+				color = tuple(style["color"]) if style["color"] else None
+				setViewStyle(obj, color=color, transparency=style["transparency"])
+		doc.recompute()
+	finally:
+		# after a failure the other workers may still be running and
+		# writing into out_dir, stop them before it is removed
+		for group, proc in procs:
+			if proc.poll() is None:
+				proc.kill()
+				proc.communicate()
+		setAnimationEnabled(True)
+		shutil.rmtree(out_dir, ignore_errors=True)
+	return doc
+
+# the eq flap and the upper hinge flanges swing about the eq axis pin,
+# clear of the lower hinge flanges, the eq base and the alt flanges
+EQ_MOVING_PARTS = ["eq_flap", "eq_base_flange_3", "eq_base_flange_4"]
+EQ_STATIC_PARTS = ["eq_base_flange_1", "eq_base_flange_2", "eq_base", "alt_flange_1", "alt_flange_2"]
+# (moving, static) pairs that touch by design and stay in contact as the
+# flap turns, so are left out of the collision checks: the hinge knuckles
+# either side of each other on the pin, the flap resting on the rounded
+# tops of the lower flanges and the rounded bottoms of the upper flanges
+# on the eq base
+EQ_MATING_PAIRS = [
+	("eq_base_flange_3", "eq_base_flange_1"),
+	("eq_base_flange_4", "eq_base_flange_2"),
+	("eq_flap", "eq_base_flange_1"),
+	("eq_flap", "eq_base_flange_2"),
+	("eq_base_flange_3", "eq_base"),
+	("eq_base_flange_4", "eq_base"),
+]
+# degrees the sky turns in an hour (one turn per sidereal day)
+SIDEREAL_RATE = 360 / 23.9344696
+
+def meshPart(obj, tolerance=0.5):
+	# tessellate a part where it is now, for the collision checks
+	points, triangles = obj.Shape.tessellate(tolerance)
+	return kinematics.MeshBVH([(p.x, p.y, p.z) for p in points], triangles)
+
+def eqAxis():
+	# the eq axis pin is a revolution about its own Y axis, which is
+	# returned pointing along +x: a positive turn about +x lifts +y, the
+	# side the free end of the flap is on, so positive angles open the flap
+	pin = partObjects["eq_axis"]
+	point = pin.Placement.Base
+	direction = pin.Placement.Rotation.multVec(App.Vector(0, 1, 0))
+	sense = 1 if direction.x >= 0 else -1
+	return (point.x, point.y, point.z), (sense * direction.x, sense * direction.y, sense * direction.z)
+
+def sweepTracking(hours=2, step=0.25, direction=1, tolerance=0.5, animate=True):
+	"""
+	Swings the eq flap about the eq axis through the given hours of tracking
+	and checks it against the static parts at every frame
+
+	Only placements are changed, the document is never recomputed. The
+	parts are tessellated once and the frames worked out up front. The
+	parts in EQ_MATING_PAIRS touch by design and are not checked against
+	each other. The flap is put back where it was afterwards.
+
+	Args:
+		hours: hours of tracking to sweep through
+		step: degrees between frames
+		direction: 1 to open the flap, -1 to close it into the eq base
+		tolerance: tessellation tolerance in mm
+		animate: show each frame in the 3D view
+
+	Returns:
+		the report from kinematics.sweep
+	"""
+	point, axis = eqAxis()
+	total = hours * SIDEREAL_RATE
+	count = int(math.ceil(total / step))
+	angles = [direction * min(i * step, total) for i in range(count + 1)]
+
+	# the frames are worked out once, for the checks and for the 3D view
+	frames = kinematics.turning(point, axis, angles)
+	moving = {name: partObjects[name] for name in EQ_MOVING_PARTS}
+	original = {name: obj.Placement for name, obj in moving.items()}
+
+	def showFrame(index, angle):
+		R, t = frames[index][1]
+		turn = App.Placement(App.Matrix(
+			R[0][0], R[0][1], R[0][2], t[0],
+			R[1][0], R[1][1], R[1][2], t[1],
+			R[2][0], R[2][1], R[2][2], t[2],
+			0, 0, 0, 1
+		))
+		for name, obj in moving.items():
+			obj.Placement = turn.multiply(original[name])
+		if App.GuiUp:
+			FreeCADGui.updateGui()
+
+	try:
+		report = kinematics.sweep(
+			{name: meshPart(obj, tolerance) for name, obj in moving.items()},
+			{name: meshPart(partObjects[name], tolerance) for name in EQ_STATIC_PARTS},
+			frames,
+			on_frame=showFrame if animate else None,
+			ignore=EQ_MATING_PAIRS
+		)
+	finally:
+		for name, obj in moving.items():
+			obj.Placement = original[name]
+
+	hit = report["first_collision"]
+	if hit:
+		print(f"first collision at {hit['angle']:.2f} degrees: {hit['moving']} hits {hit['static']}")
+	else:
+		print(f"no collisions over {total:.2f} degrees ({hours} hours)")
+	for name, c in report["clearance"].items():
+		print(f"{name:<20} min clearance {c['distance']:8.3f}mm at {c['angle']:7.2f} degrees to {c['other']}")
+	return report
+
+# degrees of freedom of each kind of sketch geometry and how many each
+# kind of constraint takes away, for counting what is left in a sketch
+GEOMETRY_DOF = {"LineSegment": 4, "Circle": 3, "ArcOfCircle": 5, "Point": 2}
+CONSTRAINT_DOF = {
+	"Coincident": 2, "Block": None, "Distance": 1, "DistanceX": 1, "DistanceY": 1,
+	"Radius": 1, "Diameter": 1, "Angle": 1, "Horizontal": 1, "Vertical": 1,
+	"Parallel": 1, "Perpendicular": 1, "Tangent": 1, "Equal": 1, "PointOnObject": 1,
+}
+
+def sketchDoF(sketch):
+	"""
+	Counts the degrees of freedom a sketch has left: those of its geometry
+	less those its constraints take away. Redundant constraints are counted
+	as if they were not, so a negative count means over (or redundantly)
+	constrained.
+	"""
+	dof = sum(GEOMETRY_DOF.get(type(g).__name__, 0) for g in sketch.Geometry)
+	for c in sketch.Constraints:
+		taken = CONSTRAINT_DOF.get(c.Type, 0)
+		if taken is None:
+			# a block fixes everything about its geometry
+			taken = GEOMETRY_DOF.get(type(sketch.Geometry[c.First]).__name__, 0)
+		dof -= taken
+	return dof
+
+def sketchStats(sketch):
+	"""
+	Measures a sketch and the feature built from it
+
+	The sketch is solved once more and it and its feature recomputed on
+	their own so that each is timed without the rest of the document.
+
+	Returns:
+		dict of sketch, geometry and constraint counts, dof (see sketchDoF),
+		solved (the solver converged), solve_ms, recompute_ms, and feature
+		and feature_ms for the pad or revolution made from it (None if
+		there is none)
+	"""
+	start = time.perf_counter()
+	solved = sketch.solve() == 0
+	solve_ms = (time.perf_counter() - start) * 1000
+
+	sketch.touch()
+	start = time.perf_counter()
+	sketch.recompute()
+	recompute_ms = (time.perf_counter() - start) * 1000
+
+	feature, feature_ms = None, None
+	dependents = [o for o in sketch.InList if o.TypeId in ("PartDesign::Pad", "Part::Revolution")]
+	if dependents:
+		feature = dependents[0]
+		feature.touch()
+		start = time.perf_counter()
+		feature.recompute()
+		feature_ms = (time.perf_counter() - start) * 1000
+	return {
+		"sketch": sketch.Name,
+		"geometry": len(sketch.Geometry),
+		"constraints": len(sketch.Constraints),
+		"dof": sketchDoF(sketch),
+		"solved": solved,
+		"solve_ms": solve_ms,
+		"recompute_ms": recompute_ms,
+		"feature": feature.Name if feature else None,
+		"feature_ms": feature_ms,
+	}
+
+def buildStats(document=None):
+	"""
+	Returns sketchStats for every sketch in the document (default the one
+	last built), costliest first. A parallel build has no sketches.
+	"""
+	document = document or doc
+	stats = [sketchStats(o) for o in document.Objects if o.TypeId == "Sketcher::SketchObject"]
+	stats.sort(key=lambda s: -(s["solve_ms"] + s["recompute_ms"] + (s["feature_ms"] or 0)))
+	return stats
+
+def printBuildStats(stats):
+	print(f"{'sketch':<24}{'geom':>6}{'cons':>6}{'dof':>6}{'solved':>8}{'solve ms':>10}{'sketch ms':>11}{'feature':>24}{'feature ms':>12}")
+	for s in stats:
+		feature_ms = f"{s['feature_ms']:.3f}" if s["feature_ms"] is not None else "-"
+		print(f"{s['sketch']:<24}{s['geometry']:>6}{s['constraints']:>6}{s['dof']:>6}{'yes' if s['solved'] else 'NO':>8}{s['solve_ms']:>10.3f}{s['recompute_ms']:>11.3f}{s['feature'] or '-':>24}{feature_ms:>12}")
+
+# Build whenever the macro is run. FreeCAD runs macro.py as __main__ from
+# the GUI but imports it as the module "macro" for `FreeCAD -c macro.py`
+# and FreeCADCmd, so this can't be an `if __name__ == "__main__"`. Code that
+# only wants the functions (bench.py, the tests) sets BARNDOOR_IMPORT_ONLY=1
+# before importing it.
+if os.environ.get("BARNDOOR_IMPORT_ONLY") != "1":
+	try:
+		if os.environ.get("BARNDOOR_WORKER_PARTS"):
+			# we are a worker started by buildParallel
+			buildWorker(os.environ["BARNDOOR_WORKER_PARTS"].split(","), os.environ["BARNDOOR_WORKER_OUT"])
+		else:
+			if PARALLEL_BUILD:
+				buildParallel()
+			else:
+				build()
+			# set BARNDOOR_SWEEP_HOURS to swing the eq flap through that much tracking
+			if os.environ.get("BARNDOOR_SWEEP_HOURS"):
+				sweepTracking(hours=float(os.environ["BARNDOOR_SWEEP_HOURS"]))
+			# set BARNDOOR_STATS=1 for a table of what each sketch costs
+			if os.environ.get("BARNDOOR_STATS") == "1":
+				printBuildStats(buildStats())
+	except Exception as e:
+		print(f"Main execution error: {str(e)}")
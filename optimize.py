@@ -0,0 +1,179 @@
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import random
+
+import profiles
+
+# Searches the free dimensions of the eq plates and hinge (profiles.TUNABLE)
+# for the best trade off between tracking error, mass and stiffness, within
+# what can be printed, and writes the winner to profiles.PARAMS_FILE where
+# the next CAD build picks it up.
+#
+#	python optimize.py                  search and print the best design
+#	python optimize.py --write          ... and hand it to the CAD build
+#
+# The model assumes a tangent drive: a threaded rod tapped through the eq
+# base at EQ_DRIVE_DISTANCE from the eq axis, pushing the flap open, turned
+# by a stepper whose controller corrects for the tangent geometry.
+
+# the search space, as (low, high) in mm
+BOUNDS = {
+	"EQ_PLATE_LENGTH": (60, 220),
+	"EQ_PLATE_WIDTH": (40, 150),
+	"EQ_PIN_INSET": (8, 30),
+	"EQ_DRIVE_DISTANCE": (30, 200),
+}
+# the largest part the printer can make
+BED_SIZE = (220, 220)
+# the hinge flanges are centred on the pin, so it has to be at least half a
+# flange in from the hinge edge of the plates for them to sit on the plate
+_flange = profiles.measure_profile(profiles.eq_base_flange_profile())["bounds"]
+PIN_EDGE_CLEARANCE = (_flange[2] - _flange[0]) / 2
+
+# tracking
+SESSION_HOURS = 2
+SIDEREAL_RATE = 2 * math.pi / (23.9344696 * 3600)  # radians per second
+ROD_PITCH = 1.25                                    # M8
+STEPS_PER_REV = 200 * 16                            # 1.8 degree stepper at 1/16 microsteps
+PIN_TOLERANCE = 0.1                                 # how far a printed pin hole can be from where it was drawn
+# load and material (PLA)
+CAMERA_LOAD = 15                                    # N, about 1.5kg of camera and ball head
+YOUNGS_MODULUS = 3500                               # N/mm^2
+DENSITY = 1.24e-3                                   # g/mm^3
+
+# what an arcsecond of tracking error, a gram and an arcsecond of sag are
+# worth against each other
+WEIGHTS = {"error": 1.0, "mass": 0.2, "flex": 0.5}
+
+ARCSEC = 180 * 3600 / math.pi
+
+def model(params):
+	"""
+	Works out the tracking error, mass and flex of a design
+
+	Returns:
+		dict of error and flex in arcseconds and mass in grams
+	"""
+	r = params["EQ_DRIVE_DISTANCE"]
+	t = profiles.DISK_THICKNESS
+	width = params["EQ_PLATE_WIDTH"]
+	theta = SIDEREAL_RATE * SESSION_HOURS * 3600
+
+	# the controller drives the rod to r tan(theta) for the drawn r, so a
+	# pin hole that is PIN_TOLERANCE out turns the flap to the wrong angle.
+	# This only falls as r grows; what holds r back is the flex below and
+	# the longer, heavier plates that a longer r needs to fit on
+	rod = r * math.tan(theta)
+	tolerance_error = abs(math.atan(rod / (r + PIN_TOLERANCE)) - theta)
+	# and the angle can only move in whole microsteps of the rod
+	step_error = (ROD_PITCH / STEPS_PER_REV) * math.cos(theta) ** 2 / r
+	error = (tolerance_error + step_error) * ARCSEC
+
+	# the flap as a beam between the hinge and the rod, loaded in the middle
+	second_moment = width * t ** 3 / 12
+	sag = CAMERA_LOAD * r ** 3 / (48 * YOUNGS_MODULUS * second_moment)
+	flex = sag / (r / 2) * ARCSEC
+
+	base = profiles.eq_base_profile(params["EQ_PLATE_LENGTH"], width, params["EQ_PIN_INSET"], r)
+	flap = profiles.eq_flap_profile(params["EQ_PLATE_LENGTH"], width)
+	area = 0
+	for p in (base, flap):
+		area += profiles.loop_area(p["outline"]) - sum(profiles.loop_area(h) for h in p["holes"])
+	mass = area * t * DENSITY
+	return {"error": error, "mass": mass, "flex": flex}
+
+def evaluate(params):
+	"""
+	Scores one design, lower is better
+
+	Returns:
+		dict of params, score (inf if the design can't be made), the model
+		figures and the reasons it can't be made
+	"""
+	problems = []
+	length, width = params["EQ_PLATE_LENGTH"], params["EQ_PLATE_WIDTH"]
+	if not (length <= BED_SIZE[0] and width <= BED_SIZE[1]) and not (length <= BED_SIZE[1] and width <= BED_SIZE[0]):
+		problems.append(f"{length:.1f} x {width:.1f} plate does not fit the {BED_SIZE[0]} x {BED_SIZE[1]} bed")
+	parts = {
+		"eq base": profiles.eq_base_profile(length, width, params["EQ_PIN_INSET"], params["EQ_DRIVE_DISTANCE"]),
+		"eq flap": profiles.eq_flap_profile(length, width),
+		"eq base flange": profiles.eq_base_flange_profile(),
+	}
+	for name, profile in parts.items():
+		problems += [f"{name}: {p}" for p in profiles.validate_profile(profile)]
+	# the hinge flanges sit on the plate round the pin
+	if params["EQ_PIN_INSET"] < PIN_EDGE_CLEARANCE:
+		problems.append(f"pin {params['EQ_PIN_INSET']:.1f}mm in is too close to the plate edge for the {2 * PIN_EDGE_CLEARANCE:g}mm hinge flanges")
+
+	figures = model(params)
+	score = math.inf if problems else sum(WEIGHTS[k] * figures[k] for k in WEIGHTS)
+	return {"params": params, "score": score, "figures": figures, "problems": problems}
+
+def _clip(params):
+	return {k: min(max(v, BOUNDS[k][0]), BOUNDS[k][1]) for k, v in params.items()}
+
+def _sample(rng):
+	return {k: rng.uniform(lo, hi) for k, (lo, hi) in BOUNDS.items()}
+
+def _perturb(rng, params, scale):
+	return _clip({k: v + rng.gauss(0, scale * (BOUNDS[k][1] - BOUNDS[k][0])) for k, v in params.items()})
+
+def optimize(rounds=12, batch=64, keep=8, workers=None, seed=1):
+	"""
+	Random search, then rounds of shrinking perturbations around the best
+	designs so far. Each batch is scored in a process pool.
+
+	Returns:
+		the best evaluation (see evaluate)
+	"""
+	rng = random.Random(seed)
+	# start from the current design as well as random ones
+	current = {k: getattr(profiles, k) for k in profiles.TUNABLE}
+	candidates = [current] + [_sample(rng) for i in range(batch - 1)]
+	results = []
+	with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+		for i in range(rounds + 1):
+			results += pool.map(evaluate, candidates, chunksize=max(1, len(candidates) // (4 * (workers or os.cpu_count() or 1))))
+			results.sort(key=lambda r: r["score"])
+			best = [r["params"] for r in results[:keep] if r["score"] < math.inf] or [_sample(rng) for j in range(keep)]
+			scale = 0.2 * 0.7 ** i
+			candidates = [_perturb(rng, best[j % len(best)], scale) for j in range(batch)]
+	return results[0]
+
+def writeParameters(params, path=profiles.PARAMS_FILE):
+	with open(path, "w") as f:
+		json.dump({k: round(v, 2) for k, v in params.items()}, f, indent=2)
+		f.write("\n")
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Optimise the barn door hinge and drive geometry")
+	parser.add_argument("--rounds", type=int, default=12)
+	parser.add_argument("--batch", type=int, default=64, help="designs scored per round")
+	parser.add_argument("--workers", type=int, default=None, help="processes, default one per CPU")
+	parser.add_argument("--seed", type=int, default=1)
+	parser.add_argument("--write", action="store_true", help=f"write the best design to {profiles.PARAMS_FILE}")
+	args = parser.parse_args(argv)
+
+	current = evaluate({k: getattr(profiles, k) for k in profiles.TUNABLE})
+	best = optimize(args.rounds, args.batch, workers=args.workers, seed=args.seed)
+	if best["score"] == math.inf:
+		print("no design could be made:")
+		for p in best["problems"]:
+			print("  " + p)
+		return 1
+	print(f"{'':<20}{'current':>12}{'best':>12}")
+	for k in profiles.TUNABLE:
+		print(f"{k:<20}{current['params'][k]:>12.2f}{best['params'][k]:>12.2f}")
+	for k, unit in (("error", "arcsec"), ("mass", "g"), ("flex", "arcsec")):
+		print(f"{k + ' (' + unit + ')':<20}{current['figures'][k]:>12.2f}{best['figures'][k]:>12.2f}")
+	print(f"{'score':<20}{current['score']:>12.2f}{best['score']:>12.2f}")
+	if args.write:
+		writeParameters(best["params"])
+		print(f"written to {profiles.PARAMS_FILE}, rebuild to use it")
+	return 0
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,823 @@
+import json
+import math
+import os
+
+# Dimensions in mm
+DISK_DIAMETER = 100
+DISK_THICKNESS = 6
+TAPPING_SIZE_10 = 8.5
+TAPPING_SIZE_8 = 6.8
+TAPPING_SIZE_6 = 5
+SLOT_RADIUS = 45
+SLOT_WIDTH=6
+# the eq plates (eq base and eq flap) and their hinge
+EQ_PLATE_LENGTH = 100   # square to the eq axis
+EQ_PLATE_WIDTH = 50     # along the eq axis
+EQ_PIN_INSET = 12.5     # from the hinge edge of the plates to the eq axis
+EQ_DRIVE_DISTANCE = 70  # from the eq axis to the drive rod, tapped through the eq base
+
+# The dimensions that optimize.py searches over. It writes the best set it
+# finds to params.json (or wherever BARNDOOR_PARAMS points) and they
+# replace the defaults above when this module is imported. The thickness
+# is not among them as macro.py stacks the parts for 6mm stock.
+TUNABLE = ("EQ_PLATE_LENGTH", "EQ_PLATE_WIDTH", "EQ_PIN_INSET", "EQ_DRIVE_DISTANCE")
+PARAMS_FILE = os.environ.get("BARNDOOR_PARAMS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "params.json"))
+
+def load_parameters(path=PARAMS_FILE):
+	with open(path) as f:
+		params = json.load(f)
+	unknown = set(params) - set(TUNABLE)
+	if unknown:
+		raise ValueError(f"{path}: not tunable: {', '.join(sorted(unknown))}")
+	return params
+
+if os.path.exists(PARAMS_FILE):
+	globals().update(load_parameters())
+
+# the smallest cut-out the laser, cutter or nozzle can make
+TOOL_DIAMETER = 0.4
+# the least material to leave between a hole or slot and any other edge
+MIN_WALL_THICKNESS = 3 * TOOL_DIAMETER
+
+# The profiles in this module are plain python descriptions of the 2D
+# geometry that macro.py turns into sketches. They have no dependency on
+# FreeCAD so they can be benchmarked, checked and measured outside of it.
+#
+# A profile segment is a dict with a start point (sx, sy) and an end point
+# (ex, ey). If it has a "connector" it is an arc about (cx, cy) running
+# anticlockwise ("a") or clockwise ("c") from start to end, otherwise it is a
+# straight line. Each segment of a loop starts where the previous one ends
+# and every loop runs anticlockwise.
+#
+# A flat part profile is a dict of:
+#	outline: a list of segments, or a circle dict {"x", "y", "r"}
+#	holes:   a list of circle dicts, optionally with a constraint "name"
+#	slots:   a list of segment lists as made by slot_profile
+
+def slot_profile(slot_width=6, cx=0, cy=0, slot_radius=40, start_angle=0, end_angle=180, direction=True):
+	# a clockwise slot covers the same ground as an anticlockwise one the other way round
+	if not direction:
+		start_angle, end_angle = end_angle, start_angle
+
+	# Convert angles to radians
+	sa = math.radians(start_angle)
+	ea = math.radians(end_angle)
+
+	# Calculate the outer and inner radii
+	outer_radius = slot_radius
+	inner_radius = slot_radius - slot_width
+
+	# Calculate the points for the outer arc
+	outer_start_x = cx + outer_radius * math.cos(sa)
+	outer_start_y = cy + outer_radius * math.sin(sa)
+	outer_end_x = cx + outer_radius * math.cos(ea)
+	outer_end_y = cy + outer_radius * math.sin(ea)
+
+	# Calculate the points for the inner arc
+	inner_start_x = cx + inner_radius * math.cos(sa)
+	inner_start_y = cy + inner_radius * math.sin(sa)
+	inner_end_x = cx + inner_radius * math.cos(ea)
+	inner_end_y = cy + inner_radius * math.sin(ea)
+
+	# Calculate the centers for the end cap arcs
+	end_cap_center_x = (outer_end_x + inner_end_x) / 2
+	end_cap_center_y = (outer_end_y + inner_end_y) / 2
+
+	start_cap_center_x = (outer_start_x + inner_start_x) / 2
+	start_cap_center_y = (outer_start_y + inner_start_y) / 2
+
+	# The slot runs anticlockwise round its outer arc and back along the
+	# inner arc, so the inner arc is clockwise from the end to the start
+	return [
+		# Outer arc
+		{
+			"sx": outer_start_x, "sy": outer_start_y,
+			"ex": outer_end_x, "ey": outer_end_y,
+			"cx": cx, "cy": cy,
+			"connector": "a",
+		},
+		{
+			"sx": outer_end_x, "sy": outer_end_y,
+			"ex": inner_end_x, "ey": inner_end_y,
+			"cx": end_cap_center_x, "cy": end_cap_center_y,
+			"connector": "a"
+		},
+		{
+			"sx": inner_end_x, "sy": inner_end_y,
+			"ex": inner_start_x, "ey": inner_start_y,
+			"cx": cx, "cy": cy,
+			"connector": "c",
+		},
+		{
+			"sx": inner_start_x, "sy": inner_start_y,
+			"ex": outer_start_x, "ey": outer_start_y,
+			"cx": start_cap_center_x, "cy": start_cap_center_y,
+			"connector": "a"
+		}
+	]
+
+def bolt_profile(sections, start_y=0):
+	"""
+	Builds the half profile of a turned part, to be revolved around the Y axis
+
+	Args:
+		sections: list of {"d": diameter, "l": length} from the bottom up
+		start_y: Y position of the bottom of the first section
+	"""
+	profile_lines = []
+	current_y = start_y
+	prev_radius = None
+
+	# Process each section to create the profile
+	for i, section in enumerate(sections):
+		# Get diameter and length from the section
+		diameter = section.get('d', 10)  # Default to 10 if not specified
+		length = section.get('l', 10)    # Default to 10 if not specified
+		# Calculate radius
+		radius = diameter / 2
+
+		if i == 0:
+			# First line: from bottom center to bottom right of first section
+			profile_lines.append({"sx": 0, "sy": current_y, "ex": radius, "ey": current_y})
+		else:
+			# If this section has a different radius than the previous one,
+			# add a horizontal line to create a step
+			if radius != prev_radius:
+				profile_lines.append({"sx": prev_radius, "sy": current_y, "ex": radius, "ey": current_y})
+
+		# Line from bottom right to top right of this section
+		profile_lines.append({"sx": radius, "sy": current_y, "ex": radius, "ey": current_y + length})
+
+		# Update the current Y position
+		current_y += length
+		prev_radius = radius
+
+		# If this is the last section, add line from top right to top center
+		if i == len(sections) - 1:
+			profile_lines.append({"sx": radius, "sy": current_y, "ex": 0, "ey": current_y})
+
+	# Add closing line from top center back to bottom center
+	profile_lines.append({"sx": 0, "sy": current_y, "ex": 0, "ey": start_y})
+	return profile_lines
+
+# Turned parts, as sections for bolt_profile
+ALT_AXIS_SECTIONS = [{"d": 10, "l": 2}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 54}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 2}]
+AZ_AXLE_SECTIONS = [{"d": TAPPING_SIZE_8, "l": 6},{"d": 10, "l": 6},{"d": 16, "l": 3}]
+AZ_CLAMP_BOLT_SECTIONS = [{"d": TAPPING_SIZE_6, "l": 6},{"d": 6, "l": 6},{"d": 10, "l": 5}]
+# the eq axis pin is the alt axis pin stretched to the width of the eq plates
+EQ_AXIS_SECTIONS = [{"d": 10, "l": 2}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 54 + EQ_PLATE_WIDTH - 50}, {"d": 9.6, "l": 1.1}, {"d": 10, "l": 2}]
+
+def top_az_disk_profile():
+	return {
+		"outline": {"x": 0, "y": 0, "r": DISK_DIAMETER / 2, "name": "top-az-disk-radius"},
+		"holes": [
+			# the center hole
+			{"x": 0, "y": 0, "r": 10 / 2, "name": "top-az-hole-radius"},
+		],
+		"slots": [
+			# two quarter circle slots for the az clamp bolts
+			slot_profile(slot_width=SLOT_WIDTH, slot_radius=SLOT_RADIUS, start_angle=0, end_angle=90),
+			slot_profile(slot_width=SLOT_WIDTH, slot_radius=SLOT_RADIUS, start_angle=180, end_angle=270),
+		],
+	}
+
+def bottom_az_disk_profile():
+	holes = [
+		# the center hole is tapped for the az axle
+		{"x": 0, "y": 0, "r": TAPPING_SIZE_8 / 2, "name": "bottom-az-hole-radius"},
+	]
+
+	# Draw 4 equidistant holes around a circle of radius 30mm
+	# These holes are for mounting to the tripod/pillar
+	MOUNT_HOLE_RADIUS = 4
+	MOUNT_HOLE_DISTANCE = 30
+	for i in range(4):
+		angle = i * 90
+		x = MOUNT_HOLE_DISTANCE * math.cos(math.radians(angle))
+		y = MOUNT_HOLE_DISTANCE * math.sin(math.radians(angle))
+		holes.append({"x": x, "y": y, "r": MOUNT_HOLE_RADIUS})
+
+	# az rotation bolt tightening holes
+	MOUNT_THREAD_RADIUS = TAPPING_SIZE_6 / 2
+	for i in range(2):
+		angle = (i * 180) + SLOT_RADIUS
+		center_radius = SLOT_RADIUS - (SLOT_WIDTH/2)  # Position holes at center of slot width
+		x = center_radius * math.cos(math.radians(angle))
+		y = center_radius * math.sin(math.radians(angle))
+		holes.append({"x": x, "y": y, "r": MOUNT_THREAD_RADIUS})
+
+	return {
+		"outline": {"x": 0, "y": 0, "r": DISK_DIAMETER / 2, "name": "bottom-az-disk-radius"},
+		"holes": holes,
+		"slots": [],
+	}
+
+def az_flange_profile():
+	width = 70
+	height = 70
+	hole_radius = 5.01
+	# Position the hole center 15mm from both edges (to leave enough material)
+	hole_x = 25
+	hole_y = height - 25
+	slot_radius = 20
+	cut = 20
+	arc_radius = 25
+
+	# Define the flange profile as lines with an arc in the top-left corner
+	flange_lines = [
+		# Bottom edge: bottom left to bottom right
+		{"sx": 0, "sy": 0, "ex": width, "ey": 0},
+
+		# Right edge: bottom right to top right before cut
+		{"sx": width, "sy": 0, "ex": width, "ey": height-cut},
+
+		# Cut edge: top right before cut to top right after cut
+		{"sx": width, "sy": height-cut, "ex": width-cut, "ey": height},
+
+		# Top edge: top right after cut to top left + arc_radius
+		{"sx": width-cut, "sy": height, "ex": arc_radius, "ey": height},
+
+		# Arc: from top edge to left edge (12 o'clock to 9 o'clock, anticlockwise)
+		{"sx": arc_radius, "sy": height, "ex": 0, "ey": height - arc_radius, "connector": "a", "cx": arc_radius, "cy": height - arc_radius},
+
+		# Left edge: arc end to bottom left
+		{"sx": 0, "sy": height - arc_radius, "ex": 0, "ey": 0}
+	]
+
+	return {
+		"outline": flange_lines,
+		"holes": [{"x": hole_x, "y": hole_y, "r": hole_radius}],
+		"slots": [
+			slot_profile(slot_width=SLOT_WIDTH, slot_radius=slot_radius, cx=hole_x, cy=hole_y, start_angle=250, end_angle=15),
+		],
+	}
+
+def alt_flange_profile():
+	# Define dimensions
+	height = 50      # rectangle height
+	width = 50       # rectangle width
+	hole_x = 25      # x position of the large hole
+	hole_y = 0       # y position of the large hole
+
+	# Define the flange profile as lines with an arc centered on the large hole
+	flange_lines = [
+		# Left edge: arc end to bottom left
+		{"sx": 0, "sy": hole_y, "ex": 0, "ey": -height/2},
+
+		# Bottom edge: bottom left to bottom right
+		{"sx": 0, "sy": -height/2, "ex": width, "ey": -height/2},
+
+		# Right edge: bottom right to top right
+		{"sx": width, "sy": -height/2, "ex": width, "ey": height/2},
+
+		# Top edge: top right to arc start
+		{"sx": width, "sy": height/2, "ex": hole_x, "ey": height/2},
+
+		# Arc: from top edge to left edge (12 o'clock to 9 o'clock, anticlockwise)
+		{"sx": hole_x, "sy": height/2, "ex": 0, "ey": hole_y, "connector": "a", "cx": hole_x, "cy": hole_y}
+	]
+
+	return {
+		"outline": flange_lines,
+		"holes": [
+			{"x": hole_x, "y": hole_y, "r": 5.01},
+			{"x": hole_x + 20 - (SLOT_WIDTH/2), "y": hole_y, "r": TAPPING_SIZE_6 / 2},
+		],
+		"slots": [],
+	}
+
+def eq_plate_profile(length=None, width=None):
+	# the eq base and eq flap are plain rectangles, long side square to the eq axis
+	length = length or EQ_PLATE_LENGTH
+	width = width or EQ_PLATE_WIDTH
+
+	lines = [
+		# Bottom edge: bottom left to bottom right
+		{"sx": 0, "sy": 0, "ex": length, "ey": 0},
+
+		# Right edge: bottom right to top right
+		{"sx": length, "sy": 0, "ex": length, "ey": width},
+
+		# Top edge: top right to top left
+		{"sx": length, "sy": width, "ex": 0, "ey": width},
+
+		# Left edge: top left to bottom left (closing line)
+		{"sx": 0, "sy": width, "ex": 0, "ey": 0}
+	]
+
+	return {"outline": lines, "holes": [], "slots": []}
+
+def eq_base_profile(length=None, width=None, pin_inset=None, drive_distance=None):
+	profile = eq_plate_profile(length, width)
+	# the drive rod is tapped through the base and pushes the flap open
+	pin_inset = pin_inset or EQ_PIN_INSET
+	drive_distance = drive_distance or EQ_DRIVE_DISTANCE
+	profile["holes"].append({"x": pin_inset + drive_distance, "y": (width or EQ_PLATE_WIDTH) / 2, "r": TAPPING_SIZE_8 / 2})
+	return profile
+
+def eq_base_flange_profile():
+	# Define dimensions
+	height = 25      # rectangle height
+	width = 25       # rectangle width
+
+	lines = [
+		# Bottom edge: bottom left to bottom right
+		{"sx": 0, "sy": 0, "ex": width, "ey": 0},
+
+		# Right edge: bottom right to top right
+		{"sx": width, "sy": 0, "ex": width, "ey": height / 2},
+
+		# Top edge radius
+		{"sx": width, "sy": height / 2, "ex": 0, "ey": height / 2, "connector": "a", "cx": width / 2, "cy": height / 2},
+
+		# Left edge: top left to bottom left (closing line)
+		{"sx": 0, "sy": height / 2, "ex": 0, "ey": 0}
+	]
+
+	return {
+		"outline": lines,
+		"holes": [{"x": width/2, "y": height/2, "r": TAPPING_SIZE_10/2}],
+		"slots": [],
+	}
+
+def eq_flap_profile(length=None, width=None):
+	return eq_plate_profile(length, width)
+
+# every flat part, by the name of the sketch it becomes
+FLAT_PARTS = {
+	"top_az_disk": top_az_disk_profile,
+	"bottom_az_disk": bottom_az_disk_profile,
+	"az_flange": az_flange_profile,
+	"alt_flange": alt_flange_profile,
+	"eq_base": eq_base_profile,
+	"eq_base_flange": eq_base_flange_profile,
+	"eq_flap": eq_flap_profile,
+}
+# how many of each flat part one kit needs
+PART_QUANTITIES = {
+	"top_az_disk": 1,
+	"bottom_az_disk": 1,
+	"az_flange": 2,
+	"alt_flange": 2,
+	"eq_base": 1,
+	"eq_base_flange": 4,
+	"eq_flap": 1,
+}
+
+# Pre-flight checks
+#
+# These run on the profile dicts before any sketch is built so that bad
+# geometry is rejected up front rather than by a failed pad recompute.
+# They are exact (arcs are not flattened, except for the inside/outside
+# test) and cheap enough to run on every sketch.
+
+# positions closer than this (mm) are the same point
+TOLERANCE = 1e-6
+TAU = 2 * math.pi
+
+LINE = 0
+ARC = 1
+
+class ProfileError(ValueError):
+	def __init__(self, name, problems):
+		super().__init__(f"{name}: " + "; ".join(problems))
+		self.name = name
+		self.problems = problems
+
+def _segment(line):
+	# (kind, sx, sy, ex, ey) for lines and
+	# (kind, sx, sy, ex, ey, cx, cy, r, lo, span, sweep) for arcs, where the
+	# arc covers the angles lo to lo + span anticlockwise and sweep is the
+	# signed angle turned from start to end
+	sx, sy = line.get("sx", 0), line.get("sy", 0)
+	ex, ey = line.get("ex", 0), line.get("ey", 0)
+	con = line.get("connector")
+	if not (con and con in "ac"):
+		return (LINE, sx, sy, ex, ey)
+	cx, cy = line["cx"], line["cy"]
+	r = math.hypot(sx - cx, sy - cy)
+	a0 = math.atan2(sy - cy, sx - cx)
+	a1 = math.atan2(ey - cy, ex - cx)
+	if con == "a":
+		span = (a1 - a0) % TAU
+		return (ARC, sx, sy, ex, ey, cx, cy, r, a0, span, span)
+	span = (a0 - a1) % TAU
+	return (ARC, sx, sy, ex, ey, cx, cy, r, a1, span, -span)
+
+def _circle(hole):
+	x, y, r = hole["x"], hole["y"], hole["r"]
+	return (ARC, x + r, y, x + r, y, x, y, r, 0.0, TAU, TAU)
+
+def loop_area(loop):
+	"""
+	Returns the area inside a loop of segments or a circle dict
+	"""
+	if isinstance(loop, dict):
+		return math.pi * loop["r"] ** 2
+	return abs(sum(segment_area(_segment(line)) for line in loop))
+
+def segment_length(s):
+	if s[0] == LINE:
+		return math.hypot(s[3] - s[1], s[4] - s[2])
+	return s[7] * s[9]
+
+def segment_area(s):
+	# this segment's share of the signed area of its loop (Green's theorem)
+	if s[0] == LINE:
+		return (s[1] * s[4] - s[3] * s[2]) / 2
+	_, sx, sy, ex, ey, cx, cy, r, lo, span, sweep = s
+	return (cx * (ey - sy) - cy * (ex - sx) + r * r * sweep) / 2
+
+def _on_arc(s, theta):
+	# is the angle theta (about the arc centre) within the arc
+	slack = TOLERANCE / s[7] if s[7] > 0 else 0
+	d = (theta - s[8]) % TAU
+	return d <= s[9] + slack or d >= TAU - slack
+
+def _arc_point(s, theta):
+	return (s[5] + s[7] * math.cos(theta), s[6] + s[7] * math.sin(theta))
+
+def _point_distance(px, py, s):
+	if s[0] == LINE:
+		_, sx, sy, ex, ey = s
+		dx, dy = ex - sx, ey - sy
+		length2 = dx * dx + dy * dy
+		t = 0 if length2 == 0 else max(0, min(1, ((px - sx) * dx + (py - sy) * dy) / length2))
+		return math.hypot(px - sx - t * dx, py - sy - t * dy)
+	d = math.hypot(px - s[5], py - s[6])
+	if _on_arc(s, math.atan2(py - s[6], px - s[5])):
+		return abs(d - s[7])
+	return min(math.hypot(px - s[1], py - s[2]), math.hypot(px - s[3], py - s[4]))
+
+def _shared_points(s, t):
+	# where two segments lying on the same line or circle overlap
+	points = [(s[1], s[2]), (s[3], s[4]), (t[1], t[2]), (t[3], t[4])]
+	return [p for i, p in enumerate(points) if _point_distance(p[0], p[1], t if i < 2 else s) <= TOLERANCE]
+
+def _intersections(s, t):
+	"""
+	Returns the points where two segments cross or touch
+	"""
+	if s[0] == ARC and t[0] == LINE:
+		s, t = t, s
+	if s[0] == LINE and t[0] == LINE:
+		_, ax, ay, bx, by = s
+		_, cx, cy, dx, dy = t
+		rx, ry = bx - ax, by - ay
+		qx, qy = dx - cx, dy - cy
+		denom = rx * qy - ry * qx
+		if abs(denom) <= TOLERANCE * TOLERANCE:
+			if abs((cx - ax) * ry - (cy - ay) * rx) <= TOLERANCE * math.hypot(rx, ry):
+				return _shared_points(s, t)
+			return []
+		u = ((cx - ax) * qy - (cy - ay) * qx) / denom
+		v = ((cx - ax) * ry - (cy - ay) * rx) / denom
+		slack_u = TOLERANCE / math.hypot(rx, ry)
+		slack_v = TOLERANCE / math.hypot(qx, qy)
+		if -slack_u <= u <= 1 + slack_u and -slack_v <= v <= 1 + slack_v:
+			return [(ax + u * rx, ay + u * ry)]
+		return []
+	if s[0] == LINE:
+		# line and arc
+		_, ax, ay, bx, by = s
+		cx, cy, r = t[5], t[6], t[7]
+		dx, dy = bx - ax, by - ay
+		fx, fy = ax - cx, ay - cy
+		a = dx * dx + dy * dy
+		b = 2 * (fx * dx + fy * dy)
+		c = fx * fx + fy * fy - r * r
+		disc = b * b - 4 * a * c
+		if a == 0 or disc < -TOLERANCE * a:
+			return []
+		root = math.sqrt(max(0, disc))
+		slack = TOLERANCE / math.sqrt(a)
+		points = []
+		for u in ((-b - root) / (2 * a), (-b + root) / (2 * a)):
+			if -slack <= u <= 1 + slack:
+				px, py = ax + u * dx, ay + u * dy
+				if _on_arc(t, math.atan2(py - cy, px - cx)):
+					points.append((px, py))
+		return points
+	# two arcs
+	x1, y1, r1 = s[5], s[6], s[7]
+	x2, y2, r2 = t[5], t[6], t[7]
+	d = math.hypot(x2 - x1, y2 - y1)
+	if d <= TOLERANCE:
+		return _shared_points(s, t) if abs(r1 - r2) <= TOLERANCE else []
+	if d > r1 + r2 + TOLERANCE or d < abs(r1 - r2) - TOLERANCE:
+		return []
+	a = (r1 * r1 - r2 * r2 + d * d) / (2 * d)
+	h = math.sqrt(max(0, r1 * r1 - a * a))
+	mx, my = x1 + a * (x2 - x1) / d, y1 + a * (y2 - y1) / d
+	points = []
+	for sign in (1, -1):
+		px, py = mx - sign * h * (y2 - y1) / d, my + sign * h * (x2 - x1) / d
+		if _on_arc(s, math.atan2(py - y1, px - x1)) and _on_arc(t, math.atan2(py - y2, px - x2)):
+			points.append((px, py))
+	return points
+
+def segment_distance(s, t):
+	"""
+	Returns the shortest distance between two segments
+	"""
+	if _intersections(s, t):
+		return 0.0
+	# the closest points are either an end of one segment or a point
+	# where both segments are square to the line joining them
+	best = min(
+		_point_distance(s[1], s[2], t), _point_distance(s[3], s[4], t),
+		_point_distance(t[1], t[2], s), _point_distance(t[3], t[4], s),
+	)
+	for a, b in ((s, t), (t, s)):
+		if a[0] != ARC:
+			continue
+		if b[0] == LINE:
+			# the points of the arc whose normals are square to the line
+			theta = math.atan2(b[3] - b[1], -(b[4] - b[2]))
+		else:
+			theta = math.atan2(b[6] - a[6], b[5] - a[5])
+		for angle in (theta, theta + math.pi):
+			if _on_arc(a, angle):
+				px, py = _arc_point(a, angle)
+				best = min(best, _point_distance(px, py, b))
+	return best
+
+def _bounds(s):
+	# (xmin, ymin, xmax, ymax) of a segment
+	xs, ys = [s[1], s[3]], [s[2], s[4]]
+	if s[0] == ARC:
+		for quarter in range(4):
+			angle = quarter * math.pi / 2
+			if _on_arc(s, angle):
+				x, y = _arc_point(s, angle)
+				xs.append(x)
+				ys.append(y)
+	return (min(xs), min(ys), max(xs), max(ys))
+
+def _gap(a, b):
+	# the distance between two bounding boxes, a lower bound on the
+	# distance between what is inside them
+	dx = max(a[0] - b[2], b[0] - a[2], 0)
+	dy = max(a[1] - b[3], b[1] - a[3], 0)
+	return math.hypot(dx, dy)
+
+def _circle_gap(s, b):
+	# a lower bound on the distance from a full circle to what is in box b,
+	# which for a circle is much tighter than its own bounding box
+	cx, cy, r = s[5], s[6], s[7]
+	near = math.hypot(max(b[0] - cx, 0, cx - b[2]), max(b[1] - cy, 0, cy - b[3]))
+	far = math.hypot(max(abs(b[0] - cx), abs(b[2] - cx)), max(abs(b[1] - cy), abs(b[3] - cy)))
+	return max(near - r, r - far, 0)
+
+def _within(a, b):
+	# is bounding box a inside bounding box b
+	return a[0] >= b[0] and a[1] >= b[1] and a[2] <= b[2] and a[3] <= b[3]
+
+def _flatten(segments):
+	# the loop as a polygon with the arcs cut into 5 degree chords, for _inside
+	points = []
+	for s in segments:
+		if s[0] == LINE:
+			points.append((s[1], s[2]))
+			continue
+		steps = max(1, int(math.ceil(s[9] / math.radians(5))))
+		chord = [_arc_point(s, s[8] + s[9] * i / steps) for i in range(1, steps)]
+		# use the exact ends so that points on the ray are counted once
+		if s[10] < 0:
+			chord.reverse()
+		points.append((s[1], s[2]))
+		points += chord
+	return points
+
+def _inside(px, py, segments, polygon=None):
+	if len(segments) == 1 and segments[0][0] == ARC and segments[0][9] >= TAU:
+		return math.hypot(px - segments[0][5], py - segments[0][6]) < segments[0][7]
+	# ray cast to +x
+	polygon = polygon or _flatten(segments)
+	inside = False
+	ax, ay = polygon[-1]
+	for bx, by in polygon:
+		if (ay > py) != (by > py) and px < ax + (py - ay) * (bx - ax) / (by - ay):
+			inside = not inside
+		ax, ay = bx, by
+	return inside
+
+def _loop_distance(a, b, limit):
+	"""
+	Returns the shortest distance between two loops of (segment, bounds)
+	pairs, or limit if they are at least that far apart
+	"""
+	best = limit
+	for s, sb in a:
+		for t, tb in b:
+			if s[0] == ARC and s[9] >= TAU:
+				gap = _circle_gap(s, tb)
+			elif t[0] == ARC and t[9] >= TAU:
+				gap = _circle_gap(t, sb)
+			else:
+				gap = _gap(sb, tb)
+			if gap < best:
+				best = min(best, segment_distance(s, t))
+	return best
+
+def validate_loop(lines, inner=False):
+	"""
+	Checks that a list of segments makes one closed, anticlockwise, non
+	self-intersecting loop with consistent arcs, and that no two segments
+	that don't meet are closer than TOOL_DIAMETER, which the tool could not
+	cut between: across a cut-out, or across a notch or neck of an outline
+
+	Args:
+		lines: the segments of the loop
+		inner: the loop is a cut-out (slot), for the problem messages
+
+	Returns:
+		list of problems, empty if the loop is good
+	"""
+	if not lines or len(lines) < 2:
+		return ["a loop needs at least 2 segments"]
+	problems = []
+	segments = []
+	for i, line in enumerate(lines):
+		con = line.get("connector")
+		if con and con in "ac" and ("cx" not in line or "cy" not in line):
+			problems.append(f"segment {i} is an arc with no centre")
+			continue
+		s = _segment(line)
+		if s[0] == ARC:
+			off = abs(math.hypot(s[3] - s[5], s[4] - s[6]) - s[7])
+			if off > TOLERANCE:
+				problems.append(f"segment {i} arc ends {off:.4f}mm off its radius")
+		if segment_length(s) <= TOLERANCE:
+			problems.append(f"segment {i} has no length")
+		segments.append(s)
+	if problems:
+		return problems
+
+	n = len(segments)
+	def same(ax, ay, bx, by):
+		return math.hypot(ax - bx, ay - by) <= TOLERANCE
+	joined = [same(segments[i][1], segments[i][2], segments[i - 1][3], segments[i - 1][4]) for i in range(n)]
+	# a segment drawn backwards ends where the previous one ends or starts
+	# where the next one starts
+	reversed_ = [
+		not joined[i] and (
+			same(segments[i][3], segments[i][4], segments[i - 1][3], segments[i - 1][4])
+			or same(segments[i][1], segments[i][2], segments[(i + 1) % n][1], segments[(i + 1) % n][2])
+		)
+		for i in range(n)
+	]
+	for i in range(n):
+		if reversed_[i]:
+			problems.append(f"segment {i} is reversed relative to its neighbours")
+		elif joined[i] or reversed_[i - 1]:
+			continue
+		elif i == 0:
+			problems.append(f"loop is not closed, the last segment ends {math.hypot(segments[0][1] - segments[-1][3], segments[0][2] - segments[-1][4]):.4f}mm from the start")
+		else:
+			problems.append(f"gap of {math.hypot(segments[i][1] - segments[i - 1][3], segments[i][2] - segments[i - 1][4]):.4f}mm between segments {i - 1} and {i}")
+	if problems:
+		return problems
+
+	narrowest = None
+	bounds = [_bounds(s) for s in segments]
+	# how far round the loop each segment starts
+	along = [0]
+	for s in segments:
+		along.append(along[-1] + segment_length(s))
+	for i in range(n):
+		for j in range(i + 1, n):
+			adjacent = j == i + 1 or (i == 0 and j == n - 1)
+			gap = _gap(bounds[i], bounds[j])
+			if gap > TOLERANCE and (adjacent or gap >= TOOL_DIAMETER):
+				continue
+			points = _intersections(segments[i], segments[j])
+			if adjacent:
+				# adjacent segments meet at their shared end(s)
+				joints = []
+				if j == i + 1:
+					joints.append((segments[i][3], segments[i][4]))
+				if i == 0 and j == n - 1:
+					joints.append((segments[j][3], segments[j][4]))
+				points = [p for p in points if all(math.hypot(p[0] - q[0], p[1] - q[1]) > TOLERANCE * 1000 for q in joints)]
+			if points:
+				problems.append(f"segments {i} and {j} intersect at ({points[0][0]:.3f}, {points[0][1]:.3f})")
+			elif not adjacent:
+				between = along[j] - along[i + 1]
+				around = along[n] - along[j + 1] + along[i]
+				if min(between, around) > TOOL_DIAMETER:
+					d = segment_distance(segments[i], segments[j])
+				else:
+					# joined by a step shorter than the tool, which brings
+					# them that close without narrowing anything, so only
+					# their far ends can be too close
+					a, b = (segments[i], segments[j]) if between <= around else (segments[j], segments[i])
+					d = min(_point_distance(a[1], a[2], b), _point_distance(b[3], b[4], a))
+				narrowest = d if narrowest is None else min(narrowest, d)
+	if problems:
+		return problems
+
+	area = sum(segment_area(s) for s in segments)
+	if area <= TOLERANCE:
+		problems.append("loop is clockwise" if area < 0 else "loop has no area")
+	if narrowest is not None and narrowest < TOOL_DIAMETER:
+		if inner:
+			problems.append(f"cut-out is {narrowest:.3f}mm across, narrower than the {TOOL_DIAMETER}mm tool")
+		else:
+			problems.append(f"outline narrows to {narrowest:.3f}mm, less than the {TOOL_DIAMETER}mm tool")
+	return problems
+
+def validate_profile(profile):
+	"""
+	Checks every loop of a flat part profile, that the holes and slots
+	are inside the outline and that they leave at least MIN_WALL_THICKNESS
+	of material to the outline and to each other
+
+	Returns:
+		list of problems, empty if the profile is good
+	"""
+	problems = []
+	outline = profile["outline"]
+	if isinstance(outline, dict):
+		if outline["r"] <= TOLERANCE:
+			problems.append("outline circle has no radius")
+		outline_segments = [_circle(outline)]
+	else:
+		problems += [f"outline: {p}" for p in validate_loop(outline)]
+		outline_segments = [_segment(line) for line in outline] if not problems else []
+
+	cutouts = []
+	for i, hole in enumerate(profile.get("holes", [])):
+		if 2 * hole["r"] < TOOL_DIAMETER:
+			problems.append(f"hole {i} is {2 * hole['r']:.3f}mm across, smaller than the {TOOL_DIAMETER}mm tool")
+		else:
+			cutouts.append((f"hole {i}", [_circle(hole)]))
+	for i, slot in enumerate(profile.get("slots", [])):
+		slot_problems = validate_loop(slot, inner=True)
+		problems += [f"slot {i}: {p}" for p in slot_problems]
+		if not slot_problems:
+			cutouts.append((f"slot {i}", [_segment(line) for line in slot]))
+	if problems:
+		return problems
+
+	outline_loop = [(s, _bounds(s)) for s in outline_segments]
+	outline_polygon = None if isinstance(outline, dict) else _flatten(outline_segments)
+	loops = []
+	for name, segments in cutouts:
+		loop = [(s, _bounds(s)) for s in segments]
+		box = (min(b[0] for _, b in loop), min(b[1] for _, b in loop), max(b[2] for _, b in loop), max(b[3] for _, b in loop))
+		loops.append((name, segments, loop, box))
+	for i, (name, segments, loop, box) in enumerate(loops):
+		wall = _loop_distance(loop, outline_loop, MIN_WALL_THICKNESS)
+		if wall <= TOLERANCE:
+			problems.append(f"{name} cuts through the outline")
+		elif not _inside(segments[0][1], segments[0][2], outline_segments, outline_polygon):
+			problems.append(f"{name} is outside the outline")
+		elif wall < MIN_WALL_THICKNESS:
+			problems.append(f"{name} leaves a {wall:.3f}mm wall to the outline, less than {MIN_WALL_THICKNESS:g}mm")
+		for other, other_segments, other_loop, other_box in loops[i + 1:]:
+			wall = _loop_distance(loop, other_loop, MIN_WALL_THICKNESS)
+			if wall <= TOLERANCE:
+				problems.append(f"{name} and {other} overlap")
+			elif wall < MIN_WALL_THICKNESS:
+				problems.append(f"{name} and {other} leave a {wall:.3f}mm wall, less than {MIN_WALL_THICKNESS:g}mm")
+			elif (_within(box, other_box) and _inside(segments[0][1], segments[0][2], other_segments)) or (_within(other_box, box) and _inside(other_segments[0][1], other_segments[0][2], segments)):
+				problems.append(f"{name} and {other} are one inside the other")
+	return problems
+
+def measure_profile(profile):
+	"""
+	Measures what it takes to cut a flat part profile, exactly from its
+	lines and arcs in one pass over the loops
+
+	Returns:
+		dict of
+			cut_length: mm of tool path round the outline, holes and slots
+			pierces: how many times the tool starts a cut, one per loop
+			area: mm^2 of the finished part
+			bounds: (xmin, ymin, xmax, ymax) of the outline
+			stock_area: mm^2 of the rectangle of stock the part is cut from
+	"""
+	outline = profile["outline"]
+	loops = [[_circle(outline)] if isinstance(outline, dict) else [_segment(line) for line in outline]]
+	loops += [[_circle(hole)] for hole in profile.get("holes", [])]
+	loops += [[_segment(line) for line in slot] for slot in profile.get("slots", [])]
+
+	cut_length = 0
+	area = 0
+	for i, loop in enumerate(loops):
+		signed = 0
+		for s in loop:
+			cut_length += segment_length(s)
+			signed += segment_area(s)
+		# the cut-outs come off the outline
+		area += abs(signed) if i == 0 else -abs(signed)
+	boxes = [_bounds(s) for s in loops[0]]
+	bounds = (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+	return {
+		"cut_length": cut_length,
+		"pierces": len(loops),
+		"area": area,
+		"bounds": bounds,
+		"stock_area": (bounds[2] - bounds[0]) * (bounds[3] - bounds[1]),
+	}
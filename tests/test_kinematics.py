@@ -0,0 +1,73 @@
+import math
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import kinematics
+
+IDENTITY = (((1, 0, 0), (0, 1, 0), (0, 0, 1)), (0, 0, 0))
+
+def boxMesh(lo, hi):
+	# the 12 triangles of an axis aligned box, wound outwards
+	points = [(x, y, z) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+	quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+	triangles = []
+	for a, b, c, d in quads:
+		triangles += [(a, b, c), (a, c, d)]
+	return kinematics.MeshBVH(points, triangles)
+
+class ClearanceTest(unittest.TestCase):
+	def test_crossing_bars(self):
+		# closest edge to edge, no vertex is near the other bar's faces
+		bar = boxMesh((-50, -0.5, 0), (50, 0.5, 1))
+		other = boxMesh((-0.5, -50, 2), (0.5, 50, 3))
+		self.assertAlmostEqual(kinematics.clearance(bar, other, IDENTITY), 1.0)
+
+	def test_crossing_bars_moved(self):
+		# the same bars, the second one turned a quarter about z and lifted
+		bar = boxMesh((-50, -0.5, 0), (50, 0.5, 1))
+		R, _ = kinematics.rotation_about_axis((0, 0, 0), (0, 0, 1), 90)
+		self.assertAlmostEqual(kinematics.clearance(bar, bar, (R, (0, 0, 2))), 1.0)
+
+	def test_nested_boxes(self):
+		# the inner box's faces are closest, its vertices are far from them
+		outer = boxMesh((0, 0, 0), (10, 10, 10))
+		inner = boxMesh((0.2, 0.2, 0.2), (9, 9, 9))
+		self.assertAlmostEqual(kinematics.clearance(outer, inner, IDENTITY), 0.2)
+
+	def test_overlapping_boxes_touch(self):
+		a = boxMesh((0, 0, 0), (10, 10, 10))
+		b = boxMesh((5, 5, 5), (15, 15, 15))
+		self.assertEqual(kinematics.clearance(a, b, IDENTITY), 0)
+
+	def test_gap_beyond_best(self):
+		a = boxMesh((0, 0, 0), (1, 1, 1))
+		b = boxMesh((0, 0, 5), (1, 1, 6))
+		self.assertEqual(kinematics.clearance(a, b, IDENTITY, best=2), 2)
+		self.assertAlmostEqual(kinematics.clearance(a, b, IDENTITY), 4)
+
+class TriangleDistanceTest(unittest.TestCase):
+	def test_crossing(self):
+		a = ((0, 0, 0), (2, 0, 0), (0, 2, 0))
+		b = ((0.5, 0.5, -1), (0.5, 0.5, 1), (3, 3, 0))
+		self.assertEqual(kinematics.triangle_distance(a, b), 0)
+
+	def test_edge_to_edge(self):
+		a = ((-1, 0, 0), (1, 0, 0), (0, -1, 0))
+		b = ((0, -1, 1), (0, 1, 1), (0, 0, 2))
+		self.assertAlmostEqual(kinematics.triangle_distance(a, b), 1)
+
+	def test_vertex_to_face(self):
+		a = ((0, 0, 0), (4, 0, 0), (0, 4, 0))
+		b = ((1, 1, 0.5), (1, 1, 3), (2, 1, 3))
+		self.assertAlmostEqual(kinematics.triangle_distance(a, b), 0.5)
+
+	def test_parallel_edges(self):
+		self.assertAlmostEqual(kinematics.segment_distance((0, 0, 0), (2, 0, 0), (1, 1, 0), (3, 1, 0)), 1)
+		self.assertAlmostEqual(kinematics.segment_distance((0, 0, 0), (1, 0, 0), (2, 1, 0), (3, 1, 0)), math.sqrt(2))
+
+if __name__ == "__main__":
+	unittest.main()
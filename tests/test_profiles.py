@@ -0,0 +1,92 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import profiles
+
+def polygon(points):
+	# a loop of straight segments through points, closed back to the first
+	return [
+		{"sx": ax, "sy": ay, "ex": bx, "ey": by}
+		for (ax, ay), (bx, by) in zip(points, points[1:] + points[:1])
+	]
+
+SQUARE = [(0, 0), (20, 0), (20, 20), (0, 20)]
+
+class ValidateLoopTest(unittest.TestCase):
+	def assertProblem(self, problems, text):
+		self.assertTrue(any(text in p for p in problems), problems)
+
+	def test_good_loops(self):
+		self.assertEqual(profiles.validate_loop(polygon(SQUARE)), [])
+		self.assertEqual(profiles.validate_loop(profiles.slot_profile(), inner=True), [])
+		self.assertEqual(profiles.validate_loop(profiles.slot_profile(direction=False), inner=True), [])
+
+	def test_open_loop(self):
+		self.assertProblem(profiles.validate_loop(polygon(SQUARE)[:-1]), "not closed")
+
+	def test_reversed_segment(self):
+		# the inner arc as the old cutSlot drew it, from the start to the end
+		slot = profiles.slot_profile()
+		inner = slot[2]
+		slot[2] = {
+			"sx": inner["ex"], "sy": inner["ey"], "ex": inner["sx"], "ey": inner["sy"],
+			"cx": inner["cx"], "cy": inner["cy"], "connector": "a",
+		}
+		self.assertProblem(profiles.validate_loop(slot, inner=True), "segment 2 is reversed")
+
+	def test_self_intersection(self):
+		self.assertProblem(profiles.validate_loop(polygon([(0, 0), (20, 20), (20, 0), (0, 20)])), "intersect")
+
+	def test_arc_end_off_its_radius(self):
+		loop = polygon(SQUARE)
+		# 5.2 from the start, 4.8 from the end
+		loop[1].update({"cx": 20, "cy": 10.2, "connector": "a"})
+		self.assertProblem(profiles.validate_loop(loop), "segment 1 arc ends 0.4000mm off its radius")
+
+	def test_clockwise_loop(self):
+		self.assertProblem(profiles.validate_loop(polygon(SQUARE[::-1])), "clockwise")
+
+	def test_slot_narrower_than_the_tool(self):
+		slot = profiles.slot_profile(slot_width=profiles.TOOL_DIAMETER / 2)
+		self.assertProblem(profiles.validate_loop(slot, inner=True), "narrower than the")
+
+	def test_outline_notch_narrower_than_the_tool(self):
+		notch = [(0, 0), (20, 0), (20, 20), (10.1, 20), (10.1, 5), (9.9, 5), (9.9, 20), (0, 20)]
+		self.assertProblem(profiles.validate_loop(polygon(notch)), "outline narrows to 0.200mm")
+
+	def test_outline_step_is_not_a_notch(self):
+		# like the shoulders of the bolts, the sides of the step are only
+		# closer than the tool where the step joins them
+		step = [(0, 0), (20, 0), (20, 10), (10, 10), (10, 10.2), (0, 10.2)]
+		self.assertEqual(profiles.validate_loop(polygon(step)), [])
+
+	def test_outline_neck_narrower_than_the_tool(self):
+		neck = [(0, 0), (10, 0), (10, 9.9), (20, 9.9), (20, 0), (30, 0), (30, 20), (20, 20), (20, 10.1), (10, 10.1), (10, 20), (0, 20)]
+		self.assertProblem(profiles.validate_loop(polygon(neck)), "outline narrows to 0.200mm")
+
+class ValidateProfileTest(unittest.TestCase):
+	def assertProblem(self, problems, text):
+		self.assertTrue(any(text in p for p in problems), problems)
+
+	def test_flat_parts(self):
+		for name, fn in profiles.FLAT_PARTS.items():
+			self.assertEqual(profiles.validate_profile(fn()), [], name)
+
+	def test_hole_with_a_thin_wall(self):
+		profile = {"outline": polygon(SQUARE), "holes": [{"x": 10, "y": 1.5, "r": 1}]}
+		self.assertProblem(profiles.validate_profile(profile), "hole 0 leaves a 0.500mm wall to the outline")
+
+	def test_hole_outside_the_outline(self):
+		profile = {"outline": polygon(SQUARE), "holes": [{"x": 50, "y": 50, "r": 2}]}
+		self.assertProblem(profiles.validate_profile(profile), "hole 0 is outside the outline")
+
+	def test_holes_too_close(self):
+		profile = {"outline": polygon(SQUARE), "holes": [{"x": 6, "y": 10, "r": 2}, {"x": 10.5, "y": 10, "r": 2}]}
+		self.assertProblem(profiles.validate_profile(profile), "hole 0 and hole 1 leave a 0.500mm wall")
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,158 @@
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Sweeps the eq flap through the real assembly, as built by macro.py.
+#
+#	python -m unittest discover tests
+#
+# Under FreeCAD (its lib directory on PYTHONPATH) the parts are built and
+# tessellated by FreeCAD. Without it the FreeCAD API is replaced by
+# benchmarks/stubcad.py, which has no geometry kernel, so the parts are
+# meshed here instead: each pad is its profile's outline (holes filled in)
+# extruded by the pad length and put where the macro placed its sketch.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+try:
+	import FreeCAD  # noqa: F401
+	STUB = False
+except ImportError:
+	import stubcad
+	stubcad.install()
+	STUB = True
+
+import kinematics
+# just the functions, not a build of the assembly
+os.environ["BARNDOOR_IMPORT_ONLY"] = "1"
+import macro
+import profiles
+
+def _cross(o, a, b):
+	return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+def triangulate(polygon):
+	# ear clipping of an anticlockwise polygon, as index triples
+	remaining = list(range(len(polygon)))
+	triangles = []
+	while len(remaining) > 3:
+		for n in range(len(remaining)):
+			i, j, k = remaining[n - 1], remaining[n], remaining[(n + 1) % len(remaining)]
+			a, b, c = polygon[i], polygon[j], polygon[k]
+			if _cross(a, b, c) <= 1e-12:
+				continue
+			others = (polygon[m] for m in remaining if m not in (i, j, k))
+			if any(_cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0 for p in others):
+				continue
+			triangles.append((i, j, k))
+			remaining.pop(n)
+			break
+		else:
+			raise ValueError("polygon has no ear")
+	triangles.append(tuple(remaining))
+	return triangles
+
+def profileOf(sketch_name):
+	# eq_base_flange_3 comes from eq_base_flange, not eq_base
+	name = max((n for n in profiles.FLAT_PARTS if sketch_name == n or sketch_name.startswith(n + "_")), key=len)
+	return profiles.FLAT_PARTS[name]()
+
+def padMesh(pad, tolerance=0.5):
+	sketch = pad.Profile
+	outline = [profiles._segment(line) for line in profileOf(sketch.Name)["outline"]]
+	polygon = profiles._flatten(outline)
+	n = len(polygon)
+	# a stub pad starts where its sketch is with an identity placement of
+	# its own, which then moves it like a FreeCAD pad's would
+	placement = pad.Placement.multiply(sketch.Placement)
+
+	def world(x, y, z):
+		v = placement.Rotation.multVec(macro.App.Vector(x, y, z))
+		return (v.x + placement.Base.x, v.y + placement.Base.y, v.z + placement.Base.z)
+
+	points = [world(x, y, 0) for x, y in polygon] + [world(x, y, pad.Length) for x, y in polygon]
+	triangles = []
+	for a, b, c in triangulate(polygon):
+		triangles += [(a, c, b), (a + n, b + n, c + n)]
+	for i in range(n):
+		j = (i + 1) % n
+		triangles += [(i, j, j + n), (i, j + n, i + n)]
+	return kinematics.MeshBVH(points, triangles)
+
+class TrackingSweepTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.export_dir = tempfile.TemporaryDirectory(prefix="barndoor-test-")
+		macro.EXPORT_DIR = cls.export_dir.name
+		with contextlib.redirect_stdout(io.StringIO()):
+			macro.build("SweepTest")
+
+	@classmethod
+	def tearDownClass(cls):
+		macro.App.closeDocument("SweepTest")
+		cls.export_dir.cleanup()
+
+	def setUp(self):
+		if STUB:
+			patcher = mock.patch.object(macro, "meshPart", padMesh)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def sweep(self, **kwargs):
+		with contextlib.redirect_stdout(io.StringIO()):
+			return macro.sweepTracking(**kwargs)
+
+	def test_mating_pairs_touch_at_rest(self):
+		meshes = {name: macro.meshPart(macro.partObjects[name]) for name in macro.EQ_MOVING_PARTS + macro.EQ_STATIC_PARTS}
+		identity = (((1, 0, 0), (0, 1, 0), (0, 0, 1)), (0, 0, 0))
+		for m, s in macro.EQ_MATING_PAIRS:
+			self.assertEqual(kinematics.clearance(meshes[m], meshes[s], identity), 0, (m, s))
+
+	def test_positive_angles_open_the_flap(self):
+		point, axis = macro.eqAxis()
+		# the free end of the flap, on its underside
+		end = (point[0], point[1] + 80, point[2] + 12.5)
+		R, t = kinematics.rotation_about_axis(point, axis, 10)
+		self.assertGreater(kinematics.apply(R, t, end)[2], end[2])
+
+	def test_opening_is_clear(self):
+		def placements():
+			return {
+				name: (tuple(getattr(p.Base, k) for k in "xyz"), tuple(p.Rotation.Q))
+				for name, p in ((n, macro.partObjects[n].Placement) for n in macro.EQ_MOVING_PARTS)
+			}
+		before = placements()
+		report = self.sweep(hours=2)
+		self.assertIsNone(report["first_collision"])
+		for name, c in report["clearance"].items():
+			self.assertGreater(c["distance"], 0, name)
+		# and the flap is put back
+		self.assertEqual(placements(), before)
+
+	def test_closing_hits_the_eq_base(self):
+		# the underside of the free end is as far above the pin as the top
+		# of the eq base is below it, half a flange, so they meet when the
+		# flap has turned through twice the angle the end is above the pin
+		# (16.3 degrees for the default 100mm plates with the pin 12.5 in)
+		step = 0.25
+		reach = profiles.EQ_PLATE_LENGTH - profiles.EQ_PIN_INSET
+		height = profiles.measure_profile(profiles.eq_base_flange_profile())["bounds"][3] / 2
+		expected = 2 * math.degrees(math.atan(height / reach))
+		# only as far as a degree past it, every frame checks every pair
+		hours = (expected + 1) / macro.SIDEREAL_RATE
+		report = self.sweep(hours=hours, step=step, direction=-1, animate=False)
+		hit = report["first_collision"]
+		self.assertIsNotNone(hit)
+		self.assertEqual((hit["moving"], hit["static"]), ("eq_flap", "eq_base"))
+		# to the frame, less what the tessellation cuts off the corners
+		self.assertTrue(expected - 0.5 < -hit["angle"] <= expected + step, (hit["angle"], expected))
+
+if __name__ == "__main__":
+	unittest.main()